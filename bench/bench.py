@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks: run the real main.py against local stand-in TMDb and
+Radarr servers (bench/fakes.py) and report, per scenario, wall time, movies
+added per second, HTTP requests per second, client-side TMDb/Radarr p50/p99
+latency and the peak RSS of the main.py process.
+
+    python bench/bench.py                      # every scenario
+    python bench/bench.py baseline async       # some of them
+    python bench/bench.py --repeat 3 --json out.json
+
+Each scenario gets fresh servers and a fresh STATE_DIR, and main.py runs in
+its own subprocess (TMDB_API_URL / RADARR_URL point at the fakes,
+TIMINGS_FILE collects its RunStats), so numbers are comparable between
+commits.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fakes import FakeRadarr, FakeTMDb  # noqa: E402
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+# Every run: no dry run, a TMDb rate limit the fakes never push against.
+BASE_ENV = {
+    "TMDB_API_KEY": "bench",
+    "RADARR_API_KEY": "bench",
+    "TMDB_RATE_LIMIT": "200",
+    "MAX_PAGES": "20",
+    "YEAR_FROM": "2000",
+    "YEAR_TO": "2025",
+}
+PASSTHROUGH_ENV = ("PATH", "HOME", "LANG", "PYTHONPATH", "VIRTUAL_ENV", "SYSTEMROOT")
+
+# Runs main.py and writes its peak RSS (KiB) to $BENCH_RSS_FILE on exit. The
+# rusage of the child is no use here: Linux carries ru_maxrss over fork+exec,
+# so it would include the fake servers' memory. VmHWM starts afresh at exec.
+CHILD = """
+import atexit, os, resource, runpy, sys
+
+def peak_rss():
+    try:
+        with open("/proc/self/status") as f:
+            kib = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(os.environ["BENCH_RSS_FILE"], "w") as f:
+        f.write(str(kib))
+
+atexit.register(peak_rss)
+sys.argv = [sys.argv[1]]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+# name -> FakeTMDb kwargs, FakeRadarr kwargs, extra env for main.py
+SCENARIOS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "baseline": {
+        "tmdb": {"movies": 2000},
+        "radarr": {"library": 5000},
+        "env": {},
+    },
+    "concurrent": {
+        "tmdb": {"movies": 2000},
+        "radarr": {"library": 5000},
+        "env": {"TMDB_CONCURRENCY": "4", "RADARR_CONCURRENCY": "8"},
+    },
+    "batched": {
+        "tmdb": {"movies": 2000},
+        "radarr": {"library": 5000},
+        "env": {"TMDB_CONCURRENCY": "4", "RADARR_CONCURRENCY": "4", "RADARR_BATCH_SIZE": "50"},
+    },
+    "async": {
+        "tmdb": {"movies": 2000},
+        "radarr": {"library": 5000},
+        "env": {"ENGINE": "async", "TMDB_CONCURRENCY": "4", "RADARR_CONCURRENCY": "8"},
+    },
+    "large-library": {
+        "tmdb": {"movies": 2000},
+        "radarr": {"library": 200000},
+        "env": {"TMDB_CONCURRENCY": "4", "RADARR_CONCURRENCY": "8"},
+    },
+    "throttled": {
+        "tmdb": {"movies": 2000, "throttle": 0.2, "retry_after": 0.5},
+        "radarr": {"library": 5000},
+        "env": {"TMDB_CONCURRENCY": "4", "RADARR_CONCURRENCY": "8"},
+    },
+    "sharded": {
+        "tmdb": {"movies": 20000},
+        "radarr": {"library": 5000},
+        "env": {"DISCOVER_SHARD": "year", "MAX_PAGES": "2", "TMDB_CONCURRENCY": "4", "RADARR_CONCURRENCY": "8"},
+    },
+}
+
+
+def run_once(name: str, spec: Dict[str, Dict[str, Any]], latency: float) -> Dict[str, Any]:
+    tmdb = FakeTMDb(latency=latency, **spec["tmdb"]).start()
+    radarr = FakeRadarr(catalog=spec["tmdb"]["movies"], latency=latency, **spec["radarr"]).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as tmp:
+            timings_file = os.path.join(tmp, "timings.json")
+            rss_file = os.path.join(tmp, "rss")
+            env = {k: v for k, v in os.environ.items() if k in PASSTHROUGH_ENV}
+            env.update(BASE_ENV)
+            env.update(spec["env"])
+            env.update(TMDB_API_URL=tmdb.url, RADARR_URL=radarr.url, STATE_DIR=tmp, TIMINGS_FILE=timings_file,
+                       BENCH_RSS_FILE=rss_file)
+
+            with open(os.path.join(tmp, "output.log"), "w+") as log:
+                start = time.monotonic()
+                proc = subprocess.run([sys.executable, "-c", CHILD, MAIN], env=env, stdout=log, stderr=subprocess.STDOUT)
+                wall = time.monotonic() - start
+                if proc.returncode != 0:
+                    log.seek(0)
+                    tail = "".join(log.readlines()[-20:])
+                    raise RuntimeError(f"{name}: main.py exited with {proc.returncode}:\n{tail}")
+
+            with open(timings_file) as f:
+                stats = json.load(f)
+            with open(rss_file) as f:
+                peak_rss_kib = int(f.read())
+    finally:
+        tmdb.stop()
+        radarr.stop()
+
+    http = stats["http"]
+    added = stats["counters"].get("movies added", 0)
+    return {
+        "wall_s": round(wall, 3),
+        "added": added,
+        "added_per_s": round(added / wall, 1),
+        "requests_per_s": round(sum(h["calls"] for h in http.values()) / wall, 1),
+        "tmdb_p50_ms": http.get("tmdb", {}).get("p50_ms", 0.0),
+        "tmdb_p99_ms": http.get("tmdb", {}).get("p99_ms", 0.0),
+        "radarr_p50_ms": http.get("radarr", {}).get("p50_ms", 0.0),
+        "radarr_p99_ms": http.get("radarr", {}).get("p99_ms", 0.0),
+        "peak_rss_mib": round(peak_rss_kib / 1024, 1),
+        "phases": stats["phases"],
+    }
+
+
+def run_scenario(name: str, repeat: int, latency: float) -> Dict[str, Any]:
+    """The run with the median wall time, plus the highest peak RSS of all runs."""
+    runs: List[Dict[str, Any]] = [run_once(name, SCENARIOS[name], latency) for _ in range(repeat)]
+    median = statistics.median_low(r["wall_s"] for r in runs)
+    result = next(r for r in runs if r["wall_s"] == median)
+    return dict(result, peak_rss_mib=max(r["peak_rss_mib"] for r in runs), runs=repeat)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark main.py against local fake TMDb and Radarr servers.")
+    ap.add_argument("scenarios", nargs="*", metavar="scenario",
+                    help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)}).")
+    ap.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the median-wall-time run is reported.")
+    ap.add_argument("--latency", type=float, default=0.02, help="Seconds each fake server sleeps per request.")
+    ap.add_argument("--json", default="", help="Also write the results (including per-phase timings) to this file.")
+    args = ap.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        ap.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    header = f"{'scenario':<14} {'wall s':>7} {'added':>6} {'add/s':>7} {'req/s':>7} " \
+             f"{'tmdb p50/p99 ms':>16} {'radarr p50/p99 ms':>18} {'rss MiB':>8}"
+    print(header)
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in args.scenarios or list(SCENARIOS):
+        r = results[name] = run_scenario(name, max(1, args.repeat), args.latency)
+        print(
+            f"{name:<14} {r['wall_s']:>7.2f} {r['added']:>6} {r['added_per_s']:>7.1f} {r['requests_per_s']:>7.1f} "
+            f"{r['tmdb_p50_ms']:>7.1f}/{r['tmdb_p99_ms']:<8.1f} {r['radarr_p50_ms']:>8.1f}/{r['radarr_p99_ms']:<9.1f} "
+            f"{r['peak_rss_mib']:>8.1f}",
+            flush=True,
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Local stand-ins for the TMDb Discover API and the Radarr v3 API, used by
+bench.py. Each server runs on its own thread on an ephemeral port and keeps
+its state in memory, so every benchmark scenario starts from a clean slate.
+"""
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 20
+PAGE_CAP = 500
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    # Headers and body go out in separate writes; with Nagle on, delayed ACKs
+    # would stall every reused connection by ~40 ms.
+    disable_nagle_algorithm = True
+    server: "FakeServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def send_json(self, code: int, obj: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self) -> Any:
+        n = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(n) or b"null")
+
+    def handle_request(self, method: str) -> None:
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = self.read_json() if method in ("POST", "PUT") else None
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+        self.server.route(self, method, url.path, query, body)
+
+    def do_GET(self) -> None:
+        self.handle_request("GET")
+
+    def do_POST(self) -> None:
+        self.handle_request("POST")
+
+    def do_PUT(self) -> None:
+        self.handle_request("PUT")
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "FakeServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def route(self, h: _Handler, method: str, path: str, query: Dict[str, str], body: Any) -> None:
+        raise NotImplementedError
+
+
+class FakeTMDb(FakeServer):
+    """
+    /3/discover/movie over a catalog of `movies` titles spread evenly across
+    2000..2025, newest first, honoring the release-date filters and TMDb's
+    500-page cap. A `throttle` share of requests gets a 429 with Retry-After.
+    """
+
+    def __init__(self, movies: int, latency: float = 0.02, throttle: float = 0.0, retry_after: float = 1.0, seed: int = 1) -> None:
+        super().__init__(latency)
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        newest, span = date(2025, 12, 31), 26 * 365
+        self.catalog = [
+            {
+                "id": 100000 + i,
+                "title": f"Movie {i}",
+                "original_title": f"Movie {i}",
+                "release_date": (newest - timedelta(days=i * span // max(1, movies))).isoformat(),
+                "vote_average": 7.5,
+                "vote_count": 500,
+                "overview": "x" * 300,  # roughly a real result's size
+            }
+            for i in range(movies)
+        ]
+
+    def route(self, h: _Handler, method: str, path: str, query: Dict[str, str], body: Any) -> None:
+        if path != "/3/discover/movie":
+            return h.send_json(404, {"status_code": 34})
+        with self.lock:
+            throttled = self.throttle > 0 and self.random.random() < self.throttle
+        if throttled:
+            return h.send_json(429, {"status_code": 25}, {"Retry-After": f"{self.retry_after:g}"})
+        gte = query.get("primary_release_date.gte", "0000")
+        lte = query.get("primary_release_date.lte", "9999")
+        matches = [m for m in self.catalog if gte <= m["release_date"] <= lte]
+        page = int(query.get("page", 1))
+        results = matches[(page - 1) * PAGE_SIZE: page * PAGE_SIZE] if page <= PAGE_CAP else []
+        h.send_json(200, {
+            "page": page,
+            "total_pages": min(PAGE_CAP, -(-len(matches) // PAGE_SIZE)),
+            "total_results": len(matches),
+            "results": results,
+        })
+
+
+class FakeRadarr(FakeServer):
+    """
+    The Radarr v3 endpoints main.py uses. The library holds `library` movies:
+    every `overlap`-th title of a FakeTMDb catalog of `catalog` movies, then
+    unrelated tmdbIds, so the library size can grow without changing how
+    many movies a run adds.
+    """
+
+    def __init__(self, library: int, catalog: int, overlap: int = 3, latency: float = 0.02) -> None:
+        super().__init__(latency)
+        owned = list(range(100000, 100000 + catalog, overlap))[:library]
+        owned += range(900000, 900000 + library - len(owned))
+        self.movies: List[Dict[str, Any]] = [self._movie(i + 1, tmdb_id) for i, tmdb_id in enumerate(owned)]
+        self.by_id = {m["id"]: m for m in self.movies}
+        self.tmdb_ids = {m["tmdbId"] for m in self.movies}
+        self.next_id = len(self.movies) + 1
+        self.tags = [{"id": 1, "label": "tmdb"}]
+        self.roots = [{"id": 1, "path": "/movies"}]
+        self.profiles = [{"id": 1, "name": "Any"}, {"id": 4, "name": "HD-1080p"}]
+        self.commands: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _movie(movie_id: int, tmdb_id: int) -> Dict[str, Any]:
+        return {
+            "id": movie_id,
+            "tmdbId": tmdb_id,
+            "title": f"Movie {tmdb_id}",
+            "year": 2020,
+            "path": f"/movies/Movie {tmdb_id} (2020)",
+            "added": "2026-01-01T00:00:00Z",
+            "images": [{"coverType": "poster", "remoteUrl": f"https://image.example/{tmdb_id}.jpg"}],
+        }
+
+    def _add(self, movie: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            if movie.get("tmdbId") in self.tmdb_ids:
+                return None
+            added = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+            movie = dict(movie, id=self.next_id, added=added)
+            self.next_id += 1
+            self.movies.append(movie)
+            self.by_id[movie["id"]] = movie
+            self.tmdb_ids.add(movie["tmdbId"])
+            return movie
+
+    def delete(self, movie_id: int) -> None:
+        with self.lock:
+            movie = self.by_id.pop(movie_id)
+            self.movies.remove(movie)
+            self.tmdb_ids.discard(movie["tmdbId"])
+
+    def route(self, h: _Handler, method: str, path: str, query: Dict[str, str], body: Any) -> None:
+        if method == "GET":
+            if path == "/api/v3/system/status":
+                return h.send_json(200, {"version": "5.0.0", "startTime": "2026-01-01T00:00:00Z"})
+            if path == "/api/v3/rootfolder":
+                return h.send_json(200, self.roots)
+            if path == "/api/v3/qualityprofile":
+                return h.send_json(200, self.profiles)
+            if path == "/api/v3/tag":
+                return h.send_json(200, self.tags)
+            if path == "/api/v3/movie":
+                return h.send_json(200, self.movies)
+            if path == "/api/v3/movie/lookup":
+                tmdb_id = int(query.get("term", "tmdb:0").split(":")[-1])
+                return h.send_json(200, [dict(self._movie(0, tmdb_id), id=None)])
+            if path.startswith("/api/v3/movie/") and path.rsplit("/", 1)[1].isdigit():
+                movie = self.by_id.get(int(path.rsplit("/", 1)[1]))
+                return h.send_json(200, movie) if movie else h.send_json(404, {"message": "NotFound"})
+        if method == "POST":
+            if path == "/api/v3/tag":
+                with self.lock:
+                    tag = {"id": len(self.tags) + 1, "label": body["label"]}
+                    self.tags.append(tag)
+                return h.send_json(201, tag)
+            if path == "/api/v3/movie":
+                movie = self._add(body)
+                if movie is None:
+                    return h.send_json(400, [{
+                        "propertyName": "TmdbId",
+                        "errorMessage": "This movie has already been added",
+                        "errorCode": "MovieExistsValidator",
+                    }])
+                return h.send_json(201, movie)
+            if path == "/api/v3/movie/import":
+                return h.send_json(200, [m for m in map(self._add, body) if m is not None])
+            if path == "/api/v3/command":
+                with self.lock:
+                    self.commands.append(body)
+                    command = dict(body, id=len(self.commands))
+                return h.send_json(201, command)
+        h.send_json(404, {"message": f"NotFound: {method} {path}"})
@@ -1,12 +1,38 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
+import base64
+import hashlib
+import sqlite3
+import codecs
+import inspect
+import mmap
+from array import array
+from bisect import bisect_left
 import time
 import argparse
-from typing import Optional, List, Dict, Set, Tuple, Any
-
+import asyncio
+import threading
+import queue
+import signal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import tomllib
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict, Set, Tuple, Any, Iterable, Iterator, Callable
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 import tmdbsimple as tmdb
 from pyarr import RadarrAPI
+from pyarr.exceptions import PyarrBadRequest, PyarrResourceNotFound
 
 
 def env(name: str, default: Optional[str] = None, required: bool = False) -> str:
@@ -23,7 +49,777 @@ def parse_year(date_str: str) -> Optional[int]:
     return int(y) if y.isdigit() else None
 
 
-def discover_movies(
+def load_state(path: str, default: Any) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def save_state(path: str, data: Any) -> None:
+    # Write-then-rename so a pod killed mid-write never leaves a torn file.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def state_key(*parts: Any) -> str:
+    """Short stable key for naming state files after the inputs they depend on."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class Cassette:
+    """
+    HTTP interactions recorded to a JSONL file, for offline runs.
+
+    In "record" mode every response is appended as it arrives. In "replay"
+    mode requests are answered from the file instead of the network, after
+    `latency_scale` times the recorded latency (0 = as fast as possible).
+    A request matches a recording by method, path, query and JSON body; the
+    host is ignored, as are API keys, which are never written: query
+    parameters in SCRUB_PARAMS are dropped and request headers not stored.
+    Repeated identical requests replay their recordings in order, the last
+    one again once they run out; anything never recorded fails like a
+    connection error.
+    """
+
+    SCRUB_PARAMS = {"api_key", "apikey"}
+    SKIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 0.0) -> None:
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.lock = threading.Lock()
+        self.recorded: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.file = open(path, "w")
+        else:
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.recorded.setdefault((entry["method"], entry["key"]), []).append(entry)
+
+    @classmethod
+    def key(cls, url: str) -> str:
+        parts = urlsplit(url)
+        query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in cls.SCRUB_PARAMS)
+        return f"{parts.path}?{urlencode(query)}" if query else parts.path
+
+    @staticmethod
+    def body_of(request: requests.PreparedRequest) -> Optional[str]:
+        body = request.body
+        if body is None:
+            return None
+        text = body.decode("utf-8", "replace") if isinstance(body, bytes) else str(body)
+        try:
+            return json.dumps(json.loads(text), sort_keys=True)
+        except ValueError:
+            return text
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response) -> None:
+        content = response.content
+        try:
+            body, encoding = content.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        entry = {
+            "method": request.method,
+            "key": self.key(request.url or ""),
+            "request_body": self.body_of(request),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in self.SKIP_HEADERS},
+            "elapsed": response.elapsed.total_seconds(),
+            "encoding": encoding,
+            "body": body,
+        }
+        line = json.dumps(entry)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def respond(self, request: requests.PreparedRequest) -> requests.Response:
+        method, key, body = request.method or "GET", self.key(request.url or ""), self.body_of(request)
+        with self.lock:
+            entries = self.recorded.get((method, key)) or []
+            matches = [i for i, e in enumerate(entries) if e["request_body"] == body]
+            if not matches:
+                detail = " with this request body" if entries else ""
+                raise requests.ConnectionError(f"No recorded response for {method} {key}{detail}", request=request)
+            entry = entries.pop(matches[0]) if len(matches) > 1 else entries[matches[0]]
+
+        delay = entry["elapsed"] * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+        content = base64.b64decode(entry["body"]) if entry["encoding"] == "base64" else entry["body"].encode("utf-8")
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.headers["Content-Length"] = str(len(content))
+        response._content = content
+        response._content_consumed = True  # so stream=True callers iterate the body we have
+        response.url = request.url or ""
+        response.request = request
+        response.elapsed = timedelta(seconds=delay)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that appends every response to a Cassette."""
+
+    def __init__(self, cassette: Cassette, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        start = time.monotonic()
+        response = super().send(request, **kwargs)
+        # Session.send only sets elapsed after the adapter returns.
+        response.elapsed = timedelta(seconds=time.monotonic() - start)
+        response.content  # read streamed bodies too, so they can be stored
+        self.cassette.record(request, response)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that answers every request from a Cassette."""
+
+    def __init__(self, cassette: Cassette) -> None:
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        return self.cassette.respond(request)
+
+    def close(self) -> None:
+        pass
+
+
+# Set by --record / --replay; make_session() routes every session through it.
+CASSETTE: Optional[Cassette] = None
+
+
+def make_session(pool_size: int) -> requests.Session:
+    """
+    requests.Session with a keep-alive connection pool sized for `pool_size`
+    concurrent calls, so workers reuse TCP/TLS connections instead of
+    handshaking per request (or discarding connections the pool can't hold).
+    With a CASSETTE the session records to it or replays from it instead.
+    """
+    session = requests.Session()
+    adapter: BaseAdapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size))
+    if CASSETTE is not None and CASSETTE.mode == "record":
+        adapter = RecordingAdapter(CASSETTE, pool_connections=4, pool_maxsize=max(1, pool_size))
+    elif CASSETTE is not None:
+        adapter = ReplayAdapter(CASSETTE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def retry_after_seconds(response: Optional[requests.Response]) -> Optional[float]:
+    """Parse Retry-After (delta-seconds or HTTP date) into seconds from now."""
+    if response is None:
+        return None
+    raw = (response.headers.get("Retry-After") or "").strip()
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(raw).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted list (0.0 if empty)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(q * len(values) + 0.5) - 1))]
+
+
+class RunStats:
+    """
+    Thread-safe run instrumentation.
+    span() times a phase: per name it keeps the call count, the summed
+    ("busy") time and the wall time from first start to last end, which stay
+    meaningful when calls overlap across threads or with other phases.
+    observer() returns a requests response hook that records, per service,
+    calls, error responses, bytes and latency (time to response headers);
+    statuses a caller expects inside expecting() are not errors. retry()
+    counts retried calls and count() any other named event.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.phases: Dict[str, Dict[str, float]] = {}
+            self.http: Dict[str, Dict[str, float]] = {}
+            self.latencies: Dict[str, List[float]] = {}
+            self.counters: Dict[str, int] = {}
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def latency_samples(self) -> Dict[str, List[float]]:
+        with self.lock:
+            return {service: list(lat) for service, lat in self.latencies.items()}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            with self.lock:
+                p = self.phases.setdefault(name, {"calls": 0, "busy": 0.0, "start": start, "end": end})
+                p["calls"] += 1
+                p["busy"] += end - start
+                p["start"] = min(p["start"], start)
+                p["end"] = max(p["end"], end)
+
+    @contextmanager
+    def expecting(self, *statuses: int) -> Iterator[None]:
+        """Responses with these statuses, on this thread inside the block, are not counted as errors."""
+        self.local.expected = statuses
+        try:
+            yield
+        finally:
+            self.local.expected = ()
+
+    def _service(self, service: str) -> Dict[str, float]:
+        return self.http.setdefault(service, {"calls": 0, "errors": 0, "retries": 0, "bytes": 0})
+
+    def add_bytes(self, service: str, n: int) -> None:
+        with self.lock:
+            self._service(service)["bytes"] += n
+
+    def retry(self, service: str) -> None:
+        with self.lock:
+            self._service(service)["retries"] += 1
+
+    def observer(self, service: str) -> Callable[..., None]:
+        def observe(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+            size = response.headers.get("Content-Length")
+            if size is None and not kwargs.get("stream"):
+                size = len(response.content)  # read right after the hooks anyway
+            with self.lock:
+                h = self._service(service)
+                h["calls"] += 1
+                h["errors"] += response.status_code >= 400 and response.status_code not in getattr(self.local, "expected", ())
+                h["bytes"] += int(size or 0)
+                self.latencies.setdefault(service, []).append(response.elapsed.total_seconds())
+        return observe
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            phases = {
+                name: {"calls": int(p["calls"]), "wall_s": round(p["end"] - p["start"], 3), "busy_s": round(p["busy"], 3)}
+                for name, p in self.phases.items()
+            }
+            http: Dict[str, Any] = {}
+            for service, h in self.http.items():
+                lat = sorted(self.latencies.get(service, []))
+                http[service] = dict(
+                    {k: int(v) for k, v in h.items()},
+                    p50_ms=round(percentile(lat, 0.50) * 1000, 1),
+                    p99_ms=round(percentile(lat, 0.99) * 1000, 1),
+                )
+            counters = dict(self.counters)
+        return {"phases": phases, "http": http, "counters": counters}
+
+    def table(self) -> str:
+        summary = self.summary()
+        lines = [f"{'phase':<20} {'calls':>7} {'wall s':>9} {'busy s':>9}"]
+        for name, p in summary["phases"].items():
+            lines.append(f"{name:<20} {p['calls']:>7} {p['wall_s']:>9.2f} {p['busy_s']:>9.2f}")
+        lines.append("")
+        lines.append(f"{'http':<20} {'calls':>7} {'errors':>7} {'retries':>7} {'KiB':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for service, h in summary["http"].items():
+            lines.append(
+                f"{service:<20} {h['calls']:>7} {h['errors']:>7} {h['retries']:>7} "
+                f"{h['bytes'] / 1024:>9.1f} {h['p50_ms']:>8.1f} {h['p99_ms']:>8.1f}"
+            )
+        if summary["counters"]:
+            lines.append("")
+            lines.extend(f"{name:<20} {n:>7}" for name, n in summary["counters"].items())
+        return "\n".join(lines)
+
+
+STATS = RunStats()
+
+
+class Metrics:
+    """
+    Cumulative Prometheus metrics, fed from STATS after every run and rendered
+    in the text exposition format (for the daemon's /metrics endpoint or a
+    Pushgateway PUT). HTTP latency is a histogram per service; counters add
+    up over the life of the process; phase durations are the last run's.
+    """
+
+    PREFIX = "radarr_picker"
+    BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    # RunStats counter name -> (metric name, help)
+    COUNTERS = {
+        "candidates": ("candidates_total", "TMDb Discover results seen."),
+        "duplicates skipped": ("duplicates_skipped_total", "Candidates already in Radarr, handled earlier or picked by another profile."),
+        "movies added": ("movies_added_total", "Movies added to Radarr."),
+        "movies failed": ("movies_failed_total", "Movies that failed to add."),
+        "tmdb cache hits": ("tmdb_cache_hits_total", "TMDb responses served from the response cache."),
+        "tmdb cache misses": ("tmdb_cache_misses_total", "TMDb calls the response cache could not serve."),
+    }
+    HTTP = {
+        "calls": ("http_requests_total", "Outbound HTTP requests."),
+        "errors": ("http_errors_total", "Outbound HTTP responses with status >= 400, except expected ones such as library probe 404s."),
+        "retries": ("http_retries_total", "Retried outbound HTTP requests."),
+        "bytes": ("http_response_bytes_total", "Response bytes received."),
+    }
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple[str, str], float] = {}  # (metric, labels) -> value
+        self.hist: Dict[str, List[float]] = {}  # service -> bucket counts + [sum, count]
+        self.phases: Dict[str, float] = {}
+        self.last_run: Tuple[float, bool] = (0.0, False)
+
+    def record_run(self, stats: RunStats, ok: bool) -> None:
+        summary = stats.summary()
+        samples = stats.latency_samples()
+        with self.lock:
+            for name, n in summary["counters"].items():
+                if name in self.COUNTERS:
+                    self._add(self.COUNTERS[name][0], "", n)
+            for service, h in summary["http"].items():
+                for key, (metric, _) in self.HTTP.items():
+                    self._add(metric, f'service="{service}"', h[key])
+            for service, lat in samples.items():
+                hist = self.hist.setdefault(service, [0.0] * (len(self.BUCKETS) + 2))
+                for v in lat:
+                    for i, le in enumerate(self.BUCKETS):
+                        if v <= le:
+                            hist[i] += 1
+                    hist[-2] += v
+                    hist[-1] += 1
+            self.phases = {name: p["wall_s"] for name, p in summary["phases"].items()}
+            self._add("runs_total", f'result="{"success" if ok else "failure"}"', 1)
+            self.last_run = (time.time(), ok)
+
+    def _add(self, metric: str, labels: str, n: float) -> None:
+        self.counters[(metric, labels)] = self.counters.get((metric, labels), 0) + n
+
+    def render(self) -> str:
+        helps = dict(self.COUNTERS.values()) | dict(self.HTTP.values()) | {"runs_total": "Completed runs by result."}
+        out: List[str] = []
+
+        def family(metric: str, kind: str, text: str) -> None:
+            out.append(f"# HELP {self.PREFIX}_{metric} {text}")
+            out.append(f"# TYPE {self.PREFIX}_{metric} {kind}")
+
+        def sample(metric: str, labels: str, value: float) -> None:
+            text = str(int(value)) if float(value).is_integer() else repr(float(value))
+            out.append(f"{self.PREFIX}_{metric}{{{labels}}} {text}" if labels else f"{self.PREFIX}_{metric} {text}")
+
+        with self.lock:
+            for metric in sorted({m for m, _ in self.counters}):
+                family(metric, "counter", helps[metric])
+                for (m, labels), value in sorted(self.counters.items()):
+                    if m == metric:
+                        sample(metric, labels, value)
+            if self.hist:
+                family("http_request_duration_seconds", "histogram", "Outbound HTTP latency (time to response headers).")
+                for service, hist in sorted(self.hist.items()):
+                    for le, n in zip(self.BUCKETS, hist):
+                        sample("http_request_duration_seconds_bucket", f'service="{service}",le="{le:g}"', n)
+                    sample("http_request_duration_seconds_bucket", f'service="{service}",le="+Inf"', hist[-1])
+                    sample("http_request_duration_seconds_sum", f'service="{service}"', hist[-2])
+                    sample("http_request_duration_seconds_count", f'service="{service}"', hist[-1])
+            if self.phases:
+                family("phase_duration_seconds", "gauge", "Wall time of each phase in the last run.")
+                for name, seconds in sorted(self.phases.items()):
+                    sample("phase_duration_seconds", f'phase="{name}"', seconds)
+            if self.last_run[0]:
+                family("last_run_timestamp_seconds", "gauge", "Unix time the last run finished.")
+                sample("last_run_timestamp_seconds", "", self.last_run[0])
+                family("last_run_success", "gauge", "1 if the last run added every movie it planned.")
+                sample("last_run_success", "", int(self.last_run[1]))
+        return "\n".join(out) + "\n"
+
+
+METRICS = Metrics()
+
+
+def serve_metrics(port: int) -> ThreadingHTTPServer:
+    """Serve METRICS on http://0.0.0.0:<port>/metrics from a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = METRICS.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def push_metrics(url: str, job: str) -> None:
+    """PUT METRICS to a Pushgateway-compatible endpoint (replacing the job's group)."""
+    res = requests.put(
+        f"{url.rstrip('/')}/metrics/job/{job}",
+        data=METRICS.render().encode(),
+        headers={"Content-Type": "text/plain; version=0.0.4"},
+        timeout=30,
+    )
+    res.raise_for_status()
+
+
+class RateLimiter:
+    """
+    Thread-safe adaptive token bucket.
+    The rate starts at the configured target, is halved on every 429 and grows
+    back by a small step per successful call, never above the target.
+    Retry-After and X-RateLimit-* response headers pause the bucket outright.
+    """
+
+    def __init__(self, rate: float, min_rate: float = 0.5) -> None:
+        self.lock = threading.Lock()
+        self.min_rate = min_rate
+        self.set_rate(rate)
+
+    def set_rate(self, rate: float) -> None:
+        with self.lock:
+            self.target = max(rate, self.min_rate)
+            self.rate = self.target
+            self.capacity = max(1.0, self.target)
+            self.tokens = self.capacity
+            self.updated = time.monotonic()
+            self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                else:
+                    wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def block_for(self, seconds: float) -> None:
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def on_success(self) -> None:
+        with self.lock:
+            self.rate = min(self.target, self.rate + self.target * 0.05)
+
+    def on_throttle(self, retry_after: Optional[float]) -> None:
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+        self.block_for(retry_after if retry_after is not None else 1.0 / self.rate)
+
+    def observe(self, response: requests.Response, *args: Any, **kwargs: Any) -> None:
+        """requests response hook: honor rate-limit headers on any response."""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None and remaining.strip() == "0" and reset and reset.strip().isdigit():
+            self.block_for(max(0.0, int(reset) - time.time()))
+        if response.status_code != 429:
+            delay = retry_after_seconds(response)
+            if delay:
+                self.block_for(delay)
+
+
+TMDB_LIMITER = RateLimiter(10.0)
+TMDB_MAX_RETRIES = 5
+
+
+def tmdb_call(fn: Any, *args: Any, **kwargs: Any) -> Any:
+    """Run a tmdbsimple call through TMDB_LIMITER, retrying 429 responses."""
+    attempt = 0
+    while True:
+        TMDB_LIMITER.acquire()
+        try:
+            res = fn(*args, **kwargs)
+        except requests.HTTPError as e:
+            resp = e.response
+            if resp is None or resp.status_code != 429 or attempt >= TMDB_MAX_RETRIES:
+                raise
+            attempt += 1
+            STATS.retry("tmdb")
+            TMDB_LIMITER.on_throttle(retry_after_seconds(resp))
+            continue
+        TMDB_LIMITER.on_success()
+        return res
+
+
+class ResponseCache:
+    """
+    On-disk cache of TMDb JSON responses in a single SQLite file.
+    Keys are the endpoint plus the normalized request parameters; every
+    endpoint has its own TTL (falling back to the "*" entry, 0 = never cache),
+    and the least recently used rows are evicted once the stored bodies exceed
+    max_bytes.
+    """
+
+    def __init__(self, path: str, ttls: Dict[str, float], max_bytes: int) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, endpoint TEXT, body BLOB, size INTEGER, stored_at REAL, accessed_at REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(accessed_at)")
+        self.db.commit()
+
+    def ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.ttls.get("*", 0.0))
+
+    @staticmethod
+    def _key(endpoint: str, params: Dict[str, Any]) -> str:
+        return hashlib.sha1(json.dumps([endpoint, params], sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+        ttl = self.ttl(endpoint)
+        if ttl <= 0:
+            return None
+        key = self._key(endpoint, params)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > ttl:
+                self.misses += 1
+                return None
+            self.db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, endpoint: str, params: Dict[str, Any], value: Any) -> None:
+        if self.ttl(endpoint) <= 0:
+            return
+        body = json.dumps(value, separators=(",", ":")).encode()
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key(endpoint, params), endpoint, body, len(body), now, now),
+            )
+            self._evict()
+            self.db.commit()
+
+    def _evict(self) -> None:
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed: List[str] = []
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            doomed.append(key)
+            total -= size
+        self.db.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in doomed])
+
+    def summary(self) -> str:
+        with self.lock:
+            entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return f"{self.hits} hits, {self.misses} misses ({entries} entries, {size // 1024} KiB)"
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """
+    "3600" -> every endpoint 3600s; "discover/movie=3600,*=86400" -> per endpoint.
+    """
+    ttls: Dict[str, float] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        endpoint, _, seconds = part.rpartition("=")
+        ttls[endpoint.strip() or "*"] = float(seconds)
+    return ttls
+
+
+TMDB_CACHE: Optional[ResponseCache] = None
+
+
+def cached_tmdb_call(endpoint: str, fn: Any, **params: Any) -> Any:
+    """tmdb_call() behind TMDB_CACHE (when configured), keyed on endpoint + params."""
+    if TMDB_CACHE is not None:
+        hit = TMDB_CACHE.get(endpoint, params)
+        if hit is not None:
+            STATS.count("tmdb cache hits")
+            return hit
+        STATS.count("tmdb cache misses")
+    res = tmdb_call(fn, **params)
+    if TMDB_CACHE is not None:
+        TMDB_CACHE.put(endpoint, params, res)
+    return res
+
+
+# Alternative TMDb API root (e.g. a local stand-in for benchmarks); "" = api.themoviedb.org.
+TMDB_API_URL = ""
+
+
+def _discover_page(params: Dict[str, Any], page: int) -> Dict[str, Any]:
+    # A fresh Discover per call: tmdbsimple copies every response onto the
+    # instance, so sharing one across worker threads would race.
+    d = tmdb.Discover()
+    if TMDB_API_URL:
+        d.base_uri = f"{TMDB_API_URL}/{tmdb.API_VERSION}"
+    # tmdbsimple asks for "Connection: close" on every request, which defeats
+    # the pooled session's keep-alive.
+    d.headers.pop("Connection", None)
+    return cached_tmdb_call("discover/movie", d.movie, page=page, **params)
+
+
+# TMDb refuses pages beyond 500 for any single Discover query.
+TMDB_PAGE_CAP = 500
+TMDB_PAGE_SIZE = 20
+
+DateWindow = Tuple[date, date]
+
+
+def _date_windows(year_from: int, year_to: int, shard: str, since: Optional[date] = None) -> List[DateWindow]:
+    if shard == "year":
+        windows = [(date(y, 1, 1), date(y, 12, 31)) for y in range(year_to, year_from - 1, -1)]
+    else:
+        windows = [(date(year_from, 1, 1), date(year_to, 12, 31))]
+    if since is not None:
+        windows = [(max(w[0], since), w[1]) for w in windows if w[1] >= since]
+    return windows
+
+
+def _split_window(w: DateWindow) -> List[DateWindow]:
+    mid = w[0] + (w[1] - w[0]) // 2
+    return [(w[0], mid), (mid + timedelta(days=1), w[1])]
+
+
+def _window_pages(data: Dict[str, Any]) -> int:
+    # total_pages may itself be clamped to the cap; total_results is not.
+    total_results = int(data.get("total_results") or 0)
+    return max(int(data.get("total_pages") or 1), -(-total_results // TMDB_PAGE_SIZE))
+
+
+def _window_overflows(w: DateWindow, first_page: Dict[str, Any], shard: str) -> bool:
+    """True if a sharded window must be bisected to get under the page cap."""
+    return shard != "none" and w[0] < w[1] and _window_pages(first_page) > TMDB_PAGE_CAP
+
+
+def _window_last_page(first_page: Dict[str, Any], max_pages: int) -> int:
+    if not first_page.get("results"):
+        return 1
+    return min(max_pages, int(first_page.get("total_pages") or 1), TMDB_PAGE_CAP)
+
+
+def _follow_ups(
+    w: DateWindow, page: int, data: Dict[str, Any], shard: str, max_pages: int
+) -> Tuple[List[Tuple[DateWindow, int]], bool]:
+    """
+    What a fetched Discover page leads to, for both engines: the (window,
+    page) requests to make next, newest first, and whether the page's own
+    results are usable. Page 1 of a window over the page cap is replaced by
+    page 1 of each half; any other page 1 brings in pages 2..last.
+    """
+    if page != 1:
+        return [], True
+    if _window_overflows(w, data, shard):
+        return [(h, 1) for h in _split_window(w)[::-1]], False
+    return [(w, p) for p in range(2, _window_last_page(data, max_pages) + 1)], True
+
+
+def discovery_query(
+    original_language: str,
+    include_genre_ids: str,
+    min_vote_avg: float,
+    min_vote_count: int,
+) -> Dict[str, Any]:
+    """Discover parameters shared by every page and date window."""
+    return dict(
+        sort_by="primary_release_date.desc",
+        include_adult=False,
+        include_video=False,
+        with_original_language=original_language,
+        with_genres=include_genre_ids,
+        vote_average_gte=min_vote_avg,
+        vote_count_gte=min_vote_count,
+    )
+
+
+def fetch_window_page(params: Dict[str, Any], w: DateWindow, page: int) -> Dict[str, Any]:
+    with STATS.span("tmdb discover page"):
+        return _discover_page(
+            dict(params, primary_release_date_gte=w[0].isoformat(), primary_release_date_lte=w[1].isoformat()),
+            page,
+        )
+
+
+def ordered_map(pool: ThreadPoolExecutor, fn: Callable[[Any], Any], items: Iterable[Any], window: int) -> Iterator[Tuple[Any, Any]]:
+    """
+    Like pool.map(), yielding (item, result) in input order, but pulls from
+    `items` lazily and keeps at most `window` calls in flight.
+    """
+    pending: deque = deque()
+    for item in items:
+        pending.append((item, pool.submit(fn, item)))
+        if len(pending) >= window:
+            head, fut = pending.popleft()
+            yield head, fut.result()
+    while pending:
+        head, fut = pending.popleft()
+        yield head, fut.result()
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_discover_movies(
     original_language: str,
     include_genre_ids: str,
     min_vote_avg: float,
@@ -31,50 +827,295 @@ def discover_movies(
     year_from: int,
     year_to: int,
     max_pages: int,
-) -> List[Dict[str, Any]]:
-    d = tmdb.Discover()
-    all_results: List[Dict[str, Any]] = []
-
-    for page in range(1, max_pages + 1):
-        data = d.movie(
-            sort_by="primary_release_date.desc",
-            include_adult=False,
-            include_video=False,
-            page=page,
-            with_original_language=original_language,
-            with_genres=include_genre_ids,
-            vote_average_gte=min_vote_avg,
-            vote_count_gte=min_vote_count,
-            primary_release_date_gte=f"{year_from}-01-01",
-            primary_release_date_lte=f"{year_to}-12-31",
-        )
+    concurrency: int = 1,
+    shard: str = "none",
+    since: Optional[date] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield Discover results page by page (pages 1..max_pages, or fewer if TMDb
+    has fewer), newest first, with duplicates dropped.
+
+    With shard="year" the date range is split into one query per year and each
+    window is bisected again while it still exceeds TMDB_PAGE_CAP pages, so
+    broad filters no longer lose older titles; max_pages then applies per window.
+
+    Page 1 of every window is requested up front to learn total_pages; later
+    pages are fetched a few ahead of the consumer through a bounded thread pool
+    of `concurrency` workers. Memory stays at a few pages however many are
+    requested, and the first results are available after one round-trip.
+
+    `since` (an incremental-run watermark) raises the lower release-date bound,
+    so paging stops as soon as the results reach it.
+    """
+    params = discovery_query(original_language, include_genre_ids, min_vote_avg, min_vote_count)
+
+    if max_pages < 1:
+        return
+
+    workers = max(1, concurrency)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+
+        def probe(w: DateWindow) -> Any:
+            return pool.submit(fetch_window_page, params, w, 1)
+
+        def window_pages(w: DateWindow, first: Any) -> Iterator[Dict[str, Any]]:
+            data = first.result()
+            later, usable = _follow_ups(w, 1, data, shard, max_pages)
+            if not usable:
+                for h, f in [(h, probe(h)) for h, _ in later]:
+                    yield from window_pages(h, f)
+                return
+            yield data
+            for _, page_data in ordered_map(pool, lambda wp: fetch_window_page(params, *wp), later, workers * 2):
+                yield page_data
+
+        seen: Set[int] = set()
+        # Windows come newest first and never overlap, so release-date order holds.
+        windows = [(w, probe(w)) for w in _date_windows(year_from, year_to, shard, since)]
+        for w, first in windows:
+            for data in window_pages(w, first):
+                for m in data.get("results") or []:
+                    if m.get("id") not in seen:
+                        seen.add(m.get("id"))
+                        yield m
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array from a byte stream one at a
+    time, so only the current element (plus one read buffer) is ever in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, started, done = "", 0, False, False
+
+    for chunk in chunks:
+        buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+        while not done:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array.")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                done = True
+                break
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element not complete yet, read more
+            if not isinstance(item, (dict, list)) and (end >= len(buf) or buf[end] not in " \t\r\n,]"):
+                break  # a scalar is only complete at a delimiter: "0." may go on as "0.5", "1e" as "1e3"
+            yield item
+            pos = end
+
+    if not done:
+        raise ValueError("JSON array ended unexpectedly.")
+
+
+def radarr_stream(radarr: RadarrAPI, path: str) -> Iterator[Any]:
+    """Stream a Radarr v3 endpoint that returns a JSON array, element by element."""
+    with radarr.session.get(
+        f"{radarr.host_url}/api/v3/{path}",
+        headers={"X-Api-Key": radarr.api_key, "Accept": "application/json"},
+        auth=getattr(radarr, "auth", None),
+        stream=True,
+    ) as res:
+        res.raise_for_status()
+        counted = "Content-Length" in res.headers  # else RunStats could not size the response
+
+        def chunks() -> Iterator[bytes]:
+            for chunk in res.iter_content(chunk_size=64 << 10):
+                if not counted:
+                    STATS.add_bytes("radarr", len(chunk))
+                yield chunk
+
+        yield from iter_json_array(chunks())
+
+
+class IntSet:
+    """
+    Read-only set of tmdbIds stored as one sorted array of unsigned 32-bit ints
+    (4 bytes per id instead of a boxed int plus a hash slot) with bisect lookups.
+    save() writes the raw array; load() memory-maps it, so reopening a large
+    library snapshot costs no parsing and only touches the pages it reads.
+    """
 
-        results = data.get("results") or []
-        if not results:
-            break
+    def __init__(self, values: Iterable[int] = ()) -> None:
+        data = array("I", sorted(values))
+        # drop duplicates in place (the array is sorted)
+        w = 0
+        for i in range(len(data)):
+            if w == 0 or data[i] != data[w - 1]:
+                data[w] = data[i]
+                w += 1
+        del data[w:]
+        self.data: Any = data
+
+    @classmethod
+    def load(cls, path: str) -> "IntSet":
+        out = cls()
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                out.data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast("I")
+        return out
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.data)
+        os.replace(tmp, path)
+
+    def union(self, values: Iterable[int]) -> "IntSet":
+        return IntSet(list(self.data) + list(values))
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int):
+            return False
+        i = bisect_left(self.data, value)
+        return i < len(self.data) and self.data[i] == value
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.data)
+
+
+def radarr_post(radarr: RadarrAPI, path: str, data: Any) -> Any:
+    """POST JSON to a Radarr v3 endpoint pyarr does not wrap."""
+    res = radarr.session.post(
+        f"{radarr.host_url}/api/v3/{path}",
+        headers={"X-Api-Key": radarr.api_key},
+        auth=getattr(radarr, "auth", None),
+        json=data,
+    )
+    if res.status_code >= 400:
+        raise RuntimeError(f"Radarr POST /api/v3/{path} failed ({res.status_code}): {res.text[:500]}")
+    return res.json()
 
-        all_results.extend(results)
 
-        total_pages = int(data.get("total_pages", page))
-        if page >= total_pages:
-            break
+# Consecutive missing Radarr movie ids after which the delta probe stops,
+# and the most it is widened to after a full download shows it stopped short.
+SNAPSHOT_PROBE_MISSES = 3
+SNAPSHOT_PROBE_MAX_MISSES = 25
 
-        time.sleep(0.25)
 
-    return all_results
+def _radarr_added_at(m: Dict[str, Any]) -> float:
+    try:
+        return datetime.fromisoformat(str(m.get("added") or "")).timestamp()
+    except (ValueError, OverflowError, OSError):
+        return 0.0
 
 
-def radarr_existing_tmdb_ids(radarr: RadarrAPI) -> Set[int]:
-    ids: Set[int] = set()
-    for m in radarr.get_movie() or []:
+def _radarr_library_scan(radarr: RadarrAPI, probed_id: int = 0, probed_at: float = 0.0) -> Tuple[IntSet, int, int]:
+    """
+    Full library download: (tmdbIds, highest Radarr movie id, lowest id above
+    `probed_id` of a movie added before `probed_at`, else 0). The last value
+    is a movie the previous delta probe should have found but stopped short
+    of, behind a run of deleted ids.
+    The response is streamed, so peak memory does not grow with the library.
+    """
+    ids = array("I")
+    max_id = missed = 0
+    for m in radarr_stream(radarr, "movie"):
         tmdb_id = m.get("tmdbId")
         if isinstance(tmdb_id, int):
-            ids.add(tmdb_id)
+            ids.append(tmdb_id)
+        movie_id = int(m.get("id") or 0)
+        max_id = max(max_id, movie_id)
+        if probed_id and movie_id > probed_id and (not missed or movie_id < missed) and 0 < _radarr_added_at(m) < probed_at:
+            missed = movie_id
+    return IntSet(ids), max_id, missed
+
+
+# In-process copy of each library snapshot, so a daemon keeps it warm
+# between runs instead of re-reading it: key -> (meta, ids).
+_LIBRARY_MEMO: Dict[str, Tuple[Dict[str, Any], IntSet]] = {}
+
+
+def radarr_existing_tmdb_ids(radarr: RadarrAPI, snapshot_path: str = "", max_age: float = 0) -> IntSet:
+    """
+    tmdbIds already in the Radarr library.
+
+    With max_age > 0 the set is kept between runs: in memory for the life of
+    the process and, with a snapshot_path, on disk (snapshot_path.json for
+    metadata, snapshot_path.u32 for the IntSet). A snapshot younger than
+    max_age seconds is refreshed by a delta probe instead of a full download:
+    Radarr assigns movie ids incrementally, so fetching ids above the highest
+    one seen finds the movies added since. The probe stops after
+    SNAPSHOT_PROBE_MISSES consecutive 404s, so it always costs at least that
+    many requests, and it cannot see past a longer run of ids deleted right
+    after they were added. Movies behind such a gap, and deletions, are only
+    picked up by the next full download. If that download finds movies the
+    last probe missed, later probes walk past gaps that wide (up to
+    SNAPSHOT_PROBE_MAX_MISSES).
+    """
+    key = snapshot_path or radarr.host_url
+    meta: Optional[Dict[str, Any]] = None
+    ids = IntSet()
+    if max_age > 0 and key in _LIBRARY_MEMO:
+        meta, ids = _LIBRARY_MEMO[key]
+    elif max_age > 0 and snapshot_path and os.path.exists(f"{snapshot_path}.u32"):
+        meta = load_state(f"{snapshot_path}.json", None)
+        ids = IntSet.load(f"{snapshot_path}.u32")
+
+    if not meta or time.time() - float(meta.get("taken_at", 0)) > max_age:
+        probe_misses = int((meta or {}).get("probe_misses") or SNAPSHOT_PROBE_MISSES)
+        probed_id = int((meta or {}).get("max_id") or 0)
+        taken_at = time.time()
+        ids, max_id, missed = _radarr_library_scan(radarr, probed_id, float((meta or {}).get("probed_at") or 0))
+        if missed:
+            probe_misses = min(SNAPSHOT_PROBE_MAX_MISSES, max(probe_misses, missed - probed_id))
+            print(f"Radarr library snapshot: the delta probe stopped short of movie id {missed} "
+                  f"behind deleted ids; probing up to {probe_misses} missing ids from now on.")
+        meta = {"taken_at": taken_at, "probed_at": taken_at, "max_id": max_id, "probe_misses": probe_misses}
+        if snapshot_path and max_age > 0:
+            os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+            ids.save(f"{snapshot_path}.u32")
+            save_state(f"{snapshot_path}.json", meta)
+        if max_age > 0:
+            _LIBRARY_MEMO[key] = (meta, ids)
+        return ids
+
+    max_id = int(meta.get("max_id") or 0)
+    probed_at = time.time()
+    new_ids: List[int] = []
+    probe, misses = max_id + 1, 0
+    while misses < int(meta.get("probe_misses") or SNAPSHOT_PROBE_MISSES):
+        try:
+            with STATS.expecting(404):  # the probe runs until it misses
+                m = radarr.get_movie(probe)
+        except PyarrResourceNotFound:
+            misses += 1
+        else:
+            misses = 0
+            max_id = probe
+            if isinstance(m, dict) and isinstance(m.get("tmdbId"), int):
+                new_ids.append(m["tmdbId"])
+        probe += 1
+
+    meta = dict(meta, max_id=max_id, probed_at=probed_at)
+    if new_ids:
+        ids = ids.union(new_ids)
+        if snapshot_path:
+            ids.save(f"{snapshot_path}.u32")
+    if snapshot_path:
+        save_state(f"{snapshot_path}.json", meta)
+    _LIBRARY_MEMO[key] = (meta, ids)
+    print(f"Radarr library snapshot reused ({len(new_ids)} new since last run).")
     return ids
 
 
-def radarr_default_root_folder(radarr: RadarrAPI) -> str:
-    roots = radarr.get_root_folder() or []
+def radarr_default_root_folder(radarr: RadarrAPI, roots: Optional[List[Dict[str, Any]]] = None) -> str:
+    if roots is None:
+        roots = radarr.get_root_folder() or []
     if not roots:
         raise RuntimeError("Radarr has no root folders configured.")
     # Radarr has no explicit 'default root' in API; first configured root is a good default.
@@ -84,8 +1125,9 @@ def radarr_default_root_folder(radarr: RadarrAPI) -> str:
     return path
 
 
-def resolve_quality_profile_id(radarr: RadarrAPI, qp: Optional[str]) -> int:
-    profiles = radarr.get_quality_profile() or []
+def resolve_quality_profile_id(radarr: RadarrAPI, qp: Optional[str], profiles: Optional[List[Dict[str, Any]]] = None) -> int:
+    if profiles is None:
+        profiles = radarr.get_quality_profile() or []
     if not profiles:
         raise RuntimeError("Radarr has no quality profiles.")
 
@@ -103,16 +1145,18 @@ def resolve_quality_profile_id(radarr: RadarrAPI, qp: Optional[str]) -> int:
     raise RuntimeError(f"Quality profile '{qp}' not found in Radarr.")
 
 
-def resolve_tag_ids(radarr: RadarrAPI, tags: List[str]) -> List[int]:
+def resolve_tag_ids(radarr: RadarrAPI, tags: List[str], existing: Optional[List[Dict[str, Any]]] = None) -> List[int]:
     """
     Accepts tag names or numeric IDs. Creates missing tags by name.
     Uses pyarr.create_tag(label) / create_tag(label=...) rather than passing a dict,
     to avoid Radarr 400 JSON type errors in some pyarr versions.
+    Tags created here are appended to `existing` when it is given.
     """
     if not tags:
         return []
 
-    existing = radarr.get_tag() or []
+    if existing is None:
+        existing = radarr.get_tag() or []
     name_to_id = {(t.get("label") or "").lower(): int(t["id"]) for t in existing if "id" in t}
 
     resolved: List[int] = []
@@ -138,6 +1182,7 @@ def resolve_tag_ids(radarr: RadarrAPI, tags: List[str]) -> List[int]:
 
         resolved.append(int(created["id"]))
         name_to_id[key] = int(created["id"])
+        existing.append(created)
 
     # dedupe while preserving order
     out: List[int] = []
@@ -149,36 +1194,51 @@ def resolve_tag_ids(radarr: RadarrAPI, tags: List[str]) -> List[int]:
     return out
 
 
-def radarr_lookup_movie_by_tmdb(radarr: RadarrAPI, tmdb_id: int) -> Dict[str, Any]:
+LookupCall = Callable[[RadarrAPI, str], Any]
+_LOOKUP_CALLS: Dict[type, LookupCall] = {}
+
+
+def _lookup_call(radarr: RadarrAPI) -> LookupCall:
     """
-    Radarr lookup endpoint supports term=tmdb:<id>.
-    Different pyarr versions expose lookup_movie with different parameter names,
-    so we try a few variants.
+    Different pyarr versions expose lookup_movie with different parameter names
+    (term=, query= or positional only). Inspect the signature once per client
+    class and reuse the matching call for every later lookup.
     """
-    term = f"tmdb:{tmdb_id}"
+    cls = type(radarr)
+    call = _LOOKUP_CALLS.get(cls)
+    if call is not None:
+        return call
 
-    # Try keyword 'term='
     try:
-        res = radarr.lookup_movie(term=term)
-    except TypeError:
-        res = None
+        params = inspect.signature(radarr.lookup_movie).parameters
+    except (TypeError, ValueError):
+        params = None
+
+    if params is None:
+        call = lambda r, term: r.lookup_movie(term)
+    elif "term" in params:
+        call = lambda r, term: r.lookup_movie(term=term)
+    elif any(
+        p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD, p.VAR_POSITIONAL)
+        for p in params.values()
+    ):
+        call = lambda r, term: r.lookup_movie(term)
+    elif "query" in params:
+        call = lambda r, term: r.lookup_movie(query=term)
+    else:
+        raise RuntimeError("pyarr RadarrAPI.lookup_movie signature not compatible (term/query/positional all unsupported).")
 
-    # Try positional (term as first arg)
-    if res is None:
-        try:
-            res = radarr.lookup_movie(term)
-        except TypeError:
-            res = None
+    _LOOKUP_CALLS[cls] = call
+    return call
 
-    # Try keyword 'query='
-    if res is None:
-        try:
-            res = radarr.lookup_movie(query=term)
-        except TypeError:
-            res = None
 
-    if res is None:
-        raise RuntimeError("pyarr RadarrAPI.lookup_movie signature not compatible (term/query/positional all failed).")
+def radarr_lookup_movie_by_tmdb(radarr: RadarrAPI, tmdb_id: int) -> Dict[str, Any]:
+    """
+    Radarr lookup endpoint supports term=tmdb:<id>.
+    """
+    term = f"tmdb:{tmdb_id}"
+    with STATS.span("radarr lookup"):
+        res = _lookup_call(radarr)(radarr, term)
 
     if isinstance(res, list):
         if not res:
@@ -191,6 +1251,15 @@ def radarr_lookup_movie_by_tmdb(radarr: RadarrAPI, tmdb_id: int) -> Dict[str, An
     raise RuntimeError(f"Unexpected lookup_movie() return type: {type(res)}")
 
 
+def tmdb_add_payload(tmdb_id: int, title: str, year: Optional[int]) -> Dict[str, Any]:
+    """
+    Minimal movie resource for POST /movie built from the Discover result.
+    Radarr refreshes the full metadata from its own TMDb proxy after adding,
+    so the lookup round-trip only duplicates that work.
+    """
+    return {"tmdbId": tmdb_id, "title": title, "year": year or 0, "images": []}
+
+
 def add_movie_to_radarr(
     radarr: RadarrAPI,
     tmdb_id: int,
@@ -202,34 +1271,1157 @@ def add_movie_to_radarr(
     monitored: bool,
     minimum_availability: str,
     dry_run: bool,
-) -> None:
+    skip_lookup: bool = False,
+    search: bool = True,
+) -> Tuple[str, Optional[int]]:
+    """
+    Add one movie and return (line to report, Radarr movie id); callers print
+    in order. With skip_lookup the add is attempted with tmdb_add_payload()
+    first and only falls back to a Radarr lookup if Radarr rejects that payload.
+    search=False adds without triggering Radarr's automatic search.
+    """
+    if dry_run:
+        return f"[DRY_RUN] Would add: {title} ({year}) tmdbId={tmdb_id}", None
+
+    def add(movie_obj: Dict[str, Any]) -> Any:
+        # Your pyarr expects: add_movie(movie_dict, root_dir, quality_profile_id, ...)
+        return radarr.add_movie(
+            movie_obj,
+            root_folder,
+            quality_profile_id,
+            monitored=monitored,
+            search_for_movie=search,
+            tags=tag_ids if tag_ids else None,
+            minimum_availability=minimum_availability,
+        )
+
+    try:
+        if skip_lookup:
+            try:
+                created = add(tmdb_add_payload(tmdb_id, title, year))
+            except PyarrBadRequest as e:
+                if "MovieExistsValidator" in str(e):
+                    raise
+                created = add(radarr_lookup_movie_by_tmdb(radarr, tmdb_id))
+        else:
+            created = add(radarr_lookup_movie_by_tmdb(radarr, tmdb_id))
+    except PyarrBadRequest as e:
+        # Added since the library was read (stale snapshot, resumed apply).
+        if "MovieExistsValidator" not in str(e):
+            raise
+        return f"Already in Radarr: {title} ({year}) tmdbId={tmdb_id}", None
+
+    if isinstance(created, dict):
+        return (
+            f"Added: {created.get('title', title)} ({created.get('year', year)}) "
+            f"tmdbId={created.get('tmdbId', tmdb_id)} radarrId={created.get('id')}"
+        ), created.get("id")
+    return f"Added: {title} ({year}) tmdbId={tmdb_id} (Radarr response type: {type(created)})", None
+
+
+# (line to report, Radarr movie id, error) for one movie
+AddResult = Tuple[Optional[str], Optional[int], Optional[Exception]]
+
+
+def add_movie_batch_to_radarr(
+    radarr: RadarrAPI,
+    items: List[Tuple[int, str, Optional[int], str]],
+    root_folder: str,
+    quality_profile_id: int,
+    tag_ids: List[int],
+    monitored: bool,
+    minimum_availability: str,
+    dry_run: bool,
+    search: bool = True,
+) -> List[AddResult]:
+    """
+    Add a chunk of movies with one POST /api/v3/movie/import, using
+    tmdb_add_payload() for each. Returns one AddResult per item, in order.
+    Radarr validates the import as a whole, so if the chunk is rejected every
+    item is retried on its own to find out which ones fail. Items the import
+    leaves out (Radarr skips movies it already has) are retried on their own
+    too, which reports those as already in Radarr.
+    """
     if dry_run:
-        print(f"[DRY_RUN] Would add: {title} ({year}) tmdbId={tmdb_id}")
+        return [
+            (f"[DRY_RUN] Would add: {title} ({year}) tmdbId={tmdb_id}", None, None)
+            for tmdb_id, title, year, _ in items
+        ]
+
+    payload = [
+        dict(
+            tmdb_add_payload(tmdb_id, title, year),
+            rootFolderPath=root_folder,
+            qualityProfileId=quality_profile_id,
+            monitored=monitored,
+            minimumAvailability=minimum_availability,
+            tags=tag_ids,
+            addOptions={"monitor": "movieOnly", "searchForMovie": search},
+        )
+        for tmdb_id, title, year, _ in items
+    ]
+
+    def add_alone(tmdb_id: int, title: str, year: Optional[int]) -> AddResult:
+        try:
+            return add_movie_to_radarr(
+                radarr, tmdb_id, title, year, root_folder, quality_profile_id, tag_ids,
+                monitored, minimum_availability, dry_run=False, skip_lookup=True, search=search,
+            ) + (None,)
+        except Exception as e:
+            return None, None, e
+
+    try:
+        created = radarr_post(radarr, "movie/import", payload)
+    except Exception:
+        # A rejected chunk, a dropped connection or a garbled reply: either
+        # way, per-movie adds tell which items really fail.
+        return [add_alone(tmdb_id, title, year) for tmdb_id, title, year, _ in items]
+
+    by_tmdb = {m.get("tmdbId"): m for m in created or [] if isinstance(m, dict)}
+    results: List[AddResult] = []
+    for tmdb_id, title, year, _ in items:
+        m = by_tmdb.get(tmdb_id)
+        if m is None:
+            results.append(add_alone(tmdb_id, title, year))
+        else:
+            results.append((
+                f"Added: {m.get('title', title)} ({m.get('year', year)}) tmdbId={tmdb_id} radarrId={m.get('id')}",
+                m.get("id"),
+                None,
+            ))
+    return results
+
+
+def queue_movie_searches(
+    radarr: RadarrAPI,
+    movie_ids: List[int],
+    batch_size: int,
+    wave_delay: float,
+    on_wave: Optional[Callable[[List[int]], None]] = None,
+) -> None:
+    """
+    Trigger Radarr searches for freshly added movies as MoviesSearch commands
+    of up to batch_size ids each, wave_delay seconds apart, instead of one
+    search per add hitting the indexers all at once. `on_wave` is called with
+    the ids of each wave Radarr accepted.
+    """
+    size = max(1, batch_size)
+    for i in range(0, len(movie_ids), size):
+        if i and wave_delay > 0:
+            time.sleep(wave_delay)
+        wave = movie_ids[i:i + size]
+        radarr.post_command("MoviesSearch", movieIds=wave)
+        print(f"Queued MoviesSearch for {len(wave)} movies.")
+        if on_wave is not None:
+            on_wave(wave)
+
+
+PlanItem = Tuple[int, str, Optional[int], str]  # (tmdbId, title, year, release date)
+
+
+def write_plan(path: str, meta: Dict[str, Any], items: List[PlanItem]) -> None:
+    """JSONL plan: one meta line, then one line per movie to add."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"meta": meta}) + "\n")
+        for tmdb_id, title, year, release_date in items:
+            f.write(json.dumps({"tmdbId": tmdb_id, "title": title, "year": year, "releaseDate": release_date}) + "\n")
+    os.replace(tmp, path)
+
+
+def read_plan(path: str) -> Tuple[Dict[str, Any], Iterator[PlanItem]]:
+    """Returns the plan's meta and an iterator that streams its movies."""
+    f = open(path, "r", encoding="utf-8")
+    first = json.loads(f.readline() or "{}")
+
+    def items() -> Iterator[PlanItem]:
+        with f:
+            for line in f:
+                if line.strip():
+                    d = json.loads(line)
+                    yield d["tmdbId"], d["title"], d.get("year"), d.get("releaseDate") or "????-??-??"
+
+    return first.get("meta") or {}, items()
+
+
+class Journal:
+    """
+    Append-only JSONL record of apply results, fsynced per line so a killed
+    pod loses at most the movies that were in flight (a resumed apply then
+    reports those as already in Radarr). "searched" lines list the Radarr ids
+    whose deferred search was queued, so a rerun does not search them again.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.done: Dict[int, Dict[str, Any]] = {}
+        self.searched: Set[int] = set()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    if rec.get("status") == "added":
+                        self.done[int(rec["tmdbId"])] = rec
+                    elif rec.get("status") == "searched":
+                        self.searched.update(int(i) for i in rec.get("radarrIds") or [])
+        except FileNotFoundError:
+            pass
+        self.lock = threading.Lock()
+        self.f = open(path, "a", encoding="utf-8")
+
+    def _write(self, rec: Dict[str, Any]) -> None:
+        self.f.write(json.dumps(rec) + "\n")
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def record(self, tmdb_id: int, status: str, **fields: Any) -> None:
+        rec = dict(tmdbId=tmdb_id, status=status, at=time.time(), **fields)
+        with self.lock:
+            self._write(rec)
+            if status == "added":
+                self.done[tmdb_id] = rec
+
+    def record_searched(self, radarr_ids: List[int]) -> None:
+        with self.lock:
+            self._write({"status": "searched", "radarrIds": radarr_ids, "at": time.time()})
+            self.searched.update(radarr_ids)
+
+    def unsearched(self) -> List[int]:
+        """Radarr ids of movies added (by this apply or an earlier one) whose search was never queued."""
+        ids = (r.get("radarrId") for r in self.done.values())
+        return [int(i) for i in ids if i is not None and int(i) not in self.searched]
+
+    def close(self) -> None:
+        self.f.close()
+
+
+def watermark_path_for(args: argparse.Namespace) -> str:
+    parts = [args.lang, args.genres, args.min_vote_avg, args.min_vote_count, args.year_from, args.year_to]
+    if args.instance:
+        parts.append(args.instance)  # each Radarr instance keeps its own watermark
+    key = state_key(*parts)
+    return os.path.join(args.state_dir, f"watermark-{key}.json")
+
+
+def advance_watermark(meta: Dict[str, Any], handled: List[PlanItem], failed: bool) -> None:
+    """
+    Record a finished apply in the watermark file named by the plan meta:
+    the tmdbIds it handled, and (only if nothing failed, so failed titles are
+    discovered again) the newest release date the plan saw.
+    """
+    path = meta.get("watermark_path")
+    if not path:
         return
+    watermark = load_state(path, {})
+    newest = watermark.get("newest_release_date") or ""
+    if not failed:
+        newest = max(newest, meta.get("newest_release_date") or "")
+    processed: Dict[str, str] = dict(watermark.get("processed") or {})
+    processed.update((str(tmdb_id), release_date) for tmdb_id, _, _, release_date in handled)
+    cutoff = (date.fromisoformat(newest) - timedelta(days=int(meta.get("overlap_days") or 0))).isoformat() if newest else ""
+    save_state(path, {
+        "newest_release_date": newest or None,
+        "processed": {k: v for k, v in processed.items() if v >= cutoff},
+    })
+
+
+def load_dedup_state(
+    args: argparse.Namespace, radarr: RadarrAPI, radarr_url: str
+) -> Tuple[IntSet, Dict[int, str], Optional[date], str]:
+    """
+    What a run dedups against: (library tmdbIds, tmdbIds handled by earlier
+    incremental runs, discovery lower bound, watermark file path).
+    """
+    snapshot_path = ""
+    if args.state_dir and args.library_snapshot_ttl > 0:
+        snapshot_path = os.path.join(args.state_dir, f"radarr-library-{state_key(radarr_url)}")
+    with STATS.span("radarr library"):
+        existing = radarr_existing_tmdb_ids(radarr, snapshot_path, args.library_snapshot_ttl)
+    print(f"Radarr currently has {len(existing)} movies with tmdbId.\n")
+
+    # Watermark: newest release date seen by the last completed run plus the
+    # tmdbIds it handled inside the overlap window (so they are not re-tried).
+    watermark_path = ""
+    watermark: Dict[str, Any] = {}
+    since: Optional[date] = None
+    if args.incremental:
+        watermark_path = watermark_path_for(args)
+        watermark = load_state(watermark_path, {})
+        if watermark.get("newest_release_date"):
+            since = date.fromisoformat(watermark["newest_release_date"]) - timedelta(days=args.overlap_days)
+            print(f"Incremental: watermark {watermark['newest_release_date']}, scanning releases since {since}\n")
+    processed: Dict[int, str] = {int(k): v for k, v in (watermark.get("processed") or {}).items()}
+    return existing, processed, since, watermark_path
+
+
+def claim(args: argparse.Namespace, tmdb_id: int) -> bool:
+    """
+    Reserve a movie for this profile. False if an earlier profile of the same
+    run already picked for the same Radarr instance (its profiles share one
+    args.claimed set).
+    """
+    if tmdb_id in args.claimed:
+        return False
+    args.claimed.add(tmdb_id)
+    return True
+
+
+def plan_item(m: Dict[str, Any]) -> PlanItem:
+    tmdb_id = m["id"]
+    title = m.get("title") or m.get("original_title") or f"tmdb:{tmdb_id}"
+    release_date = m.get("release_date") or "????-??-??"
+    year = parse_year(m.get("release_date") or "")
+    return tmdb_id, title, year, release_date
+
+
+def plan_meta(args: argparse.Namespace, watermark_path: str, newest_release_date: str) -> Dict[str, Any]:
+    return {
+        "created_at": time.time(),
+        "watermark_path": watermark_path,
+        "newest_release_date": newest_release_date,
+        "overlap_days": args.overlap_days,
+    }
+
+
+def newest_past_release(release_date: Optional[str], newest: str, today: str) -> str:
+    # Clamp to today: announced future releases must not push the watermark
+    # past titles that are still to be released.
+    if release_date and newest < release_date <= today:
+        return release_date
+    return newest
 
-    movie_obj = radarr_lookup_movie_by_tmdb(radarr, tmdb_id)
 
-    # Your pyarr expects: add_movie(movie_dict, root_dir, quality_profile_id, ...)
-    created = radarr.add_movie(
-        movie_obj,
-        root_folder,
-        quality_profile_id,
-        monitored=monitored,
-        tags=tag_ids if tag_ids else None,
-        minimum_availability=minimum_availability,
+def discover_candidates(args: argparse.Namespace, since: Optional[date]) -> Iterator[Dict[str, Any]]:
+    return iter_discover_movies(
+        original_language=args.lang,
+        include_genre_ids=args.genres,
+        min_vote_avg=args.min_vote_avg,
+        min_vote_count=args.min_vote_count,
+        year_from=args.year_from,
+        year_to=args.year_to,
+        max_pages=args.max_pages,
+        concurrency=args.concurrency,
+        shard=args.shard,
+        since=since,
     )
 
-    if isinstance(created, dict):
+
+class CandidateFilter:
+    """
+    Dedup step shared by both engines. Called with each Discover result, it
+    returns the PlanItem to add, or None for a repeat of an earlier result,
+    a movie already in Radarr, one handled by an earlier run, or one claimed
+    by an earlier profile. Tracks the newest release date in `meta`.
+    """
+
+    def __init__(self, args: argparse.Namespace, existing: IntSet, processed: Dict[int, str], meta: Dict[str, Any]) -> None:
+        self.args = args
+        self.existing = existing
+        self.processed = processed
+        self.meta = meta
+        self.today = date.today().isoformat()
+        self.seen: Set[Any] = set()
+        self.fetched = 0
+        self.planned = 0
+
+    def __call__(self, m: Dict[str, Any]) -> Optional[PlanItem]:
+        tmdb_id = m.get("id")
+        if tmdb_id in self.seen:
+            return None
+        self.seen.add(tmdb_id)
+        self.fetched += 1
+        STATS.count("candidates")
+        self.meta["newest_release_date"] = newest_past_release(m.get("release_date"), self.meta["newest_release_date"], self.today)
+        if not isinstance(tmdb_id, int):
+            return None
+        if tmdb_id in self.existing or tmdb_id in self.processed or not claim(self.args, tmdb_id):
+            STATS.count("duplicates skipped")
+            return None
+        self.planned += 1
+        return plan_item(m)
+
+    def report(self) -> None:
+        print(f"\nTMDb candidates fetched: {self.fetched}")
+        print(f"Movies to add: {self.planned}")
+
+
+def filter_candidates(
+    args: argparse.Namespace,
+    candidates: Iterable[Dict[str, Any]],
+    existing: IntSet,
+    processed: Dict[int, str],
+    meta: Dict[str, Any],
+) -> Iterator[PlanItem]:
+    """CandidateFilter over an iterable of Discover results."""
+    keep = CandidateFilter(args, existing, processed, meta)
+    for m in candidates:
+        item = keep(m)
+        if item is not None:
+            yield item
+    keep.report()
+
+
+def stream_plan(args: argparse.Namespace, radarr: RadarrAPI, radarr_url: str) -> Tuple[Iterator[PlanItem], Dict[str, Any]]:
+    """
+    Library snapshot, then TMDb discovery deduped against it as pages arrive.
+    Returns (movies to add, plan meta); the meta's newest_release_date is
+    filled in once the iterator is exhausted.
+    """
+    existing, processed, since, watermark_path = load_dedup_state(args, radarr, radarr_url)
+    meta = plan_meta(args, watermark_path, "")
+    return filter_candidates(args, discover_candidates(args, since), existing, processed, meta), meta
+
+
+def plan_movies(args: argparse.Namespace, radarr: RadarrAPI, radarr_url: str) -> Tuple[List[PlanItem], Dict[str, Any]]:
+    """stream_plan(), collected: returns (to_add, plan meta)."""
+    items, meta = stream_plan(args, radarr, radarr_url)
+    return list(items), meta
+
+
+def add_planned(
+    args: argparse.Namespace,
+    radarr: RadarrAPI,
+    root_folder: str,
+    quality_profile_id: int,
+    tag_ids: List[int],
+    item: PlanItem,
+) -> AddResult:
+    """One planned movie through add_movie_to_radarr(), with any error returned instead of raised."""
+    tmdb_id, title, year, _ = item
+    try:
+        with STATS.span("radarr add"):
+            return add_movie_to_radarr(
+                radarr=radarr,
+                tmdb_id=tmdb_id,
+                title=title,
+                year=year,
+                root_folder=root_folder,
+                quality_profile_id=quality_profile_id,
+                tag_ids=tag_ids,
+                monitored=args.monitored == "true",
+                minimum_availability=args.minimum_availability,
+                dry_run=args.dry_run,
+                skip_lookup=args.skip_lookup,
+                search=not args.defer_search,
+            ) + (None,)
+    except Exception as e:
+        return None, None, e
+
+
+class AddReport:
+    """
+    Outcome of the adds of one run or apply, shared by both engines: prints
+    each result, counts it, journals it (when given a journal) and collects
+    handled items, failures and the Radarr ids of added movies.
+    """
+
+    def __init__(self, journal: Optional[Journal] = None) -> None:
+        self.journal = journal
+        self.handled: List[PlanItem] = []
+        self.failures: List[Tuple[int, str, Exception]] = []
+        self.added_ids: List[int] = []
+
+    def record(self, item: PlanItem, result: AddResult) -> None:
+        line, radarr_id, err = result
+        tmdb_id, title, year, release_date = item
+        print(f"{release_date} | {title} | tmdbId={tmdb_id}")
+        if err is None:
+            print(line)
+            self.handled.append(item)
+            if radarr_id is not None:
+                self.added_ids.append(radarr_id)
+                STATS.count("movies added")
+            if self.journal is not None:
+                self.journal.record(tmdb_id, "added", radarrId=radarr_id)
+        else:
+            print(f"Failed: {title} ({year}) tmdbId={tmdb_id}: {err}")
+            self.failures.append((tmdb_id, title, err))
+            STATS.count("movies failed")
+            if self.journal is not None:
+                self.journal.record(tmdb_id, "failed", error=str(err))
+
+
+def apply_movies(
+    args: argparse.Namespace,
+    radarr: RadarrAPI,
+    items: Iterable[PlanItem],
+    root_folder: str,
+    quality_profile_id: int,
+    tag_ids: List[int],
+    journal: Optional[Journal] = None,
+) -> Tuple[List[PlanItem], List[Tuple[int, str, Exception]], List[int]]:
+    """
+    Add every planned movie; returns (handled, failures, added Radarr ids).
+    Lookups and adds (or import chunks) run in a bounded pool and results are
+    reported in plan order, so the log reads the same as a sequential run.
+    """
+    def add_one(item: PlanItem) -> AddResult:
+        return add_planned(args, radarr, root_folder, quality_profile_id, tag_ids, item)
+
+    def add_batch(chunk: List[PlanItem]) -> List[AddResult]:
+        try:
+            with STATS.span("radarr import"):
+                return add_movie_batch_to_radarr(
+                    radarr, chunk, root_folder, quality_profile_id, tag_ids, args.monitored == "true",
+                    args.minimum_availability, args.dry_run, search=not args.defer_search,
+                )
+        except Exception as e:
+            return [(None, None, e)] * len(chunk)
+
+    report = AddReport(journal)
+    workers = max(1, args.radarr_workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if args.batch_size > 0:
+            results: Iterator[Tuple[PlanItem, AddResult]] = (
+                pair
+                for chunk, chunk_results in ordered_map(pool, add_batch, chunked(items, args.batch_size), workers * 2)
+                for pair in zip(chunk, chunk_results)
+            )
+        else:
+            results = ordered_map(pool, add_one, items, workers * 2)
+
+        for item, result in results:
+            report.record(item, result)
+
+    return report.handled, report.failures, report.added_ids
+
+
+async def run_async_pipeline(
+    args: argparse.Namespace,
+    radarr: RadarrAPI,
+    radarr_url: str,
+    root_folder: str,
+    quality_profile_id: int,
+    tag_ids: List[int],
+) -> Tuple[List[PlanItem], List[Tuple[int, str, Exception]], List[int], Dict[str, Any]]:
+    """
+    Streaming discover -> dedup -> lookup/add engine; same results as
+    plan_movies() + apply_movies(), but the first add starts as soon as the
+    first Discover page arrives.
+
+    Stages are connected by asyncio queues: TMDB_CONCURRENCY page workers feed
+    a bounded candidate queue (so discovery waits when Radarr falls behind),
+    one dedup task feeds a bounded add queue, and RADARR_CONCURRENCY add
+    workers drain it. Blocking calls run on a dedicated thread pool through
+    the same pooled sessions, rate limiter and cache as the threaded engine.
+    Adds are reported as they complete, so output order can vary.
+    Returns (handled, failures, added Radarr ids, plan meta).
+    """
+    tmdb_workers = max(1, args.concurrency)
+    radarr_workers = max(1, args.radarr_workers)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=tmdb_workers + radarr_workers)
+    loop.set_default_executor(executor)
+
+    existing, processed, since, watermark_path = await asyncio.to_thread(load_dedup_state, args, radarr, radarr_url)
+    params = discovery_query(args.lang, args.genres, args.min_vote_avg, args.min_vote_count)
+    meta = plan_meta(args, watermark_path, "")
+    keep = CandidateFilter(args, existing, processed, meta)
+    report = AddReport()
+
+    # Page tasks are unbounded: page workers enqueue follow-up pages themselves.
+    page_q: "asyncio.Queue[Tuple[DateWindow, int]]" = asyncio.Queue()
+    cand_q: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=TMDB_PAGE_SIZE * tmdb_workers)
+    add_q: "asyncio.Queue[Optional[PlanItem]]" = asyncio.Queue(maxsize=radarr_workers * 2)
+    if args.max_pages >= 1:
+        for w in _date_windows(args.year_from, args.year_to, args.shard, since):
+            page_q.put_nowait((w, 1))
+
+    errors: List[Exception] = []
+
+    async def page_worker() -> None:
+        while True:
+            w, page = await page_q.get()
+            try:
+                if errors:
+                    continue  # drain the queue after a failure
+                data = await asyncio.to_thread(fetch_window_page, params, w, page)
+                later, usable = _follow_ups(w, page, data, args.shard, args.max_pages)
+                for request in later:
+                    page_q.put_nowait(request)
+                if usable:
+                    for m in data.get("results") or []:
+                        await cand_q.put(m)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                page_q.task_done()
+
+    async def dedup() -> None:
+        while (m := await cand_q.get()) is not None:
+            item = keep(m)
+            if item is not None:
+                await add_q.put(item)
+        for _ in range(radarr_workers):
+            await add_q.put(None)
+
+    async def add_worker() -> None:
+        while (item := await add_q.get()) is not None:
+            result = await asyncio.to_thread(add_planned, args, radarr, root_folder, quality_profile_id, tag_ids, item)
+            report.record(item, result)
+
+    try:
+        pages = [asyncio.create_task(page_worker()) for _ in range(tmdb_workers)]
+        dedup_task = asyncio.create_task(dedup())
+        adders = [asyncio.create_task(add_worker()) for _ in range(radarr_workers)]
+
+        await page_q.join()
+        for t in pages:
+            t.cancel()
+        await cand_q.put(None)
+        await dedup_task
+        await asyncio.gather(*adders)
+    finally:
+        executor.shutdown(wait=False)
+
+    if errors:
+        raise errors[0]
+
+    keep.report()
+    return report.handled, report.failures, report.added_ids, meta
+
+
+def _cron_field(spec: str, lo: int, hi: int) -> Set[int]:
+    out: Set[int] = set()
+    for part in spec.split(","):
+        rng, _, step = part.partition("/")
+        if rng == "*":
+            a, b = lo, hi
+        elif "-" in rng:
+            a, b = (int(x) for x in rng.split("-", 1))
+        else:
+            a = b = int(rng)
+            if step:
+                b = hi
+        if a < lo or b > hi or a > b:
+            raise ValueError(f"Cron field '{spec}' out of range {lo}-{hi}.")
+        out.update(range(a, b + 1, int(step) if step else 1))
+    return out
+
+
+def next_cron_time(expr: str, after: float) -> float:
+    """
+    Next local time strictly after `after` matching a 5-field cron expression
+    (minute hour day-of-month month day-of-week; *, lists, ranges and /steps).
+    As in (Vixie) cron, a restricted day-of-month and day-of-week match
+    either one; a field starting with "*" (e.g. "*/2") counts as unrestricted
+    for that rule, so "0 0 */2 * 1" means odd days that are also Mondays.
+    Non-matching months, days and hours are skipped whole; the search gives
+    up after 8 years, enough for a Feb 29 schedule to come round.
+    """
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError(f"Cron expression needs 5 fields: '{expr}'")
+    minutes = _cron_field(fields[0], 0, 59)
+    hours = _cron_field(fields[1], 0, 23)
+    doms = _cron_field(fields[2], 1, 31)
+    months = _cron_field(fields[3], 1, 12)
+    dows = {d % 7 for d in _cron_field(fields[4], 0, 7)}
+    dom_any, dow_any = fields[2].startswith("*"), fields[4].startswith("*")
+
+    t = datetime.fromtimestamp(after).replace(second=0, microsecond=0) + timedelta(minutes=1)
+    end = t + timedelta(days=8 * 366)
+    while t < end:
+        if t.month not in months:
+            t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            continue
+        dow = (t.weekday() + 1) % 7  # cron: Sunday = 0
+        if dom_any or dow_any:
+            day_ok = t.day in doms and dow in dows
+        else:
+            day_ok = t.day in doms or dow in dows
+        if not day_ok:
+            t = t.replace(hour=0, minute=0) + timedelta(days=1)
+        elif t.hour not in hours:
+            t = t.replace(minute=0) + timedelta(hours=1)
+        elif t.minute not in minutes:
+            t += timedelta(minutes=1)
+        elif t.timestamp() <= after:
+            t += timedelta(minutes=1)  # a wall time repeated when DST ends
+        else:
+            return t.timestamp()
+    raise ValueError(f"Cron expression never matches: '{expr}'")
+
+
+def run_daemon(args: argparse.Namespace, run: Callable[[], int]) -> int:
+    """
+    Call `run` forever: every --interval seconds, or at each --schedule slot.
+    A failed run is reported and the loop carries on; SIGTERM/SIGINT stop it
+    between runs.
+    """
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    next_at = next_cron_time(args.schedule, time.time()) if args.schedule else time.time()
+    while True:
+        if stop.wait(max(0.0, next_at - time.time())):
+            return 0
+        started = time.time()
+        print(f"=== Run started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))} ===")
+        try:
+            rc = run()
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            rc = 1
+        next_at = next_cron_time(args.schedule, time.time()) if args.schedule else started + args.interval
         print(
-            f"Added: {created.get('title', title)} ({created.get('year', year)}) "
-            f"tmdbId={created.get('tmdbId', tmdb_id)} radarrId={created.get('id')}"
+            f"=== Run finished (exit {rc}) in {time.time() - started:.1f}s; "
+            f"next run {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(next_at))} ===\n",
+            flush=True,
         )
-    else:
-        print(f"Added: {title} ({year}) tmdbId={tmdb_id} (Radarr response type: {type(created)})")
+
+
+def radarr_config_path(args: argparse.Namespace, radarr: RadarrAPI) -> str:
+    if not args.state_dir or args.radarr_config_ttl <= 0:
+        return ""
+    return os.path.join(args.state_dir, f"radarr-config-{state_key(radarr.host_url)}.json")
+
+
+def radarr_settings(
+    radarr: RadarrAPI, settings: Dict[str, Any], cache_path: str = "", max_age: float = 0, refresh: bool = False
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Root folders, quality profiles and tags, fetched once into `settings`
+    with concurrent requests. Returns (settings, whether they were fetched
+    just now rather than reused); refresh=True always fetches.
+
+    With a cache_path and max_age > 0 they are also kept on disk. A bundle
+    younger than max_age seconds is reused after a single system/status call
+    shows the same Radarr process (startTime) is still running, so a restart
+    or upgrade always refetches.
+    """
+    if settings and not refresh:
+        return settings, False
+
+    status: Optional[Dict[str, Any]] = None
+    if cache_path and max_age > 0 and not refresh:
+        bundle = load_state(cache_path, None)
+        if bundle and time.time() - float(bundle.get("taken_at", 0)) <= max_age:
+            status = radarr.get_system_status() or {}
+            if status.get("startTime") == bundle.get("startTime"):
+                settings.update((k, bundle[k]) for k in ("roots", "profiles", "tags"))
+                print("Radarr config reused from cache.")
+                return settings, False
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        roots = pool.submit(radarr.get_root_folder)
+        profiles = pool.submit(radarr.get_quality_profile)
+        tags = pool.submit(radarr.get_tag)
+        if cache_path and max_age > 0 and status is None:
+            status = pool.submit(radarr.get_system_status).result() or {}
+        settings["roots"] = roots.result() or []
+        settings["profiles"] = profiles.result() or []
+        settings["tags"] = tags.result() or []
+
+    if status is not None:
+        settings["startTime"] = status.get("startTime")
+        save_radarr_settings(cache_path, settings)
+    return settings, True
+
+
+def save_radarr_settings(cache_path: str, settings: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    save_state(cache_path, dict(settings, taken_at=time.time()))
+
+
+def resolve_radarr_config(args: argparse.Namespace, radarr: RadarrAPI, settings: Dict[str, Any]) -> Tuple[str, int, List[int]]:
+    """
+    Root folder, quality profile id and tag ids for `args`. If reused
+    settings lack something (say a profile created in Radarr after they were
+    cached), they are refetched once before giving up.
+    """
+    cache_path = radarr_config_path(args, radarr)
+    settings, fetched = radarr_settings(radarr, settings, cache_path, args.radarr_config_ttl)
+    try:
+        return _resolve_with_settings(args, radarr, settings, cache_path)
+    except (RuntimeError, PyarrBadRequest) as e:
+        if fetched:
+            raise
+        print(f"{e} Refetching the Radarr config.")
+        settings, _ = radarr_settings(radarr, settings, cache_path, args.radarr_config_ttl, refresh=True)
+        return _resolve_with_settings(args, radarr, settings, cache_path)
+
+
+def _resolve_with_settings(
+    args: argparse.Namespace, radarr: RadarrAPI, settings: Dict[str, Any], cache_path: str
+) -> Tuple[str, int, List[int]]:
+    root_folder = args.root_folder.strip() or radarr_default_root_folder(radarr, settings["roots"])
+    quality_profile_id = resolve_quality_profile_id(radarr, args.quality_profile.strip() or None, settings["profiles"])
+    known_tags = len(settings["tags"])
+    tag_ids = resolve_tag_ids(radarr, [t for t in args.tags.split(",") if t.strip()], settings["tags"])
+    if cache_path and len(settings["tags"]) > known_tags:
+        save_radarr_settings(cache_path, settings)  # keep newly created tags
+    return root_folder, quality_profile_id, tag_ids
+
+
+def warm_radarr_config(args: argparse.Namespace, radarr: RadarrAPI, warm: Dict[str, Any]) -> Tuple[str, int, List[int]]:
+    """
+    resolve_radarr_config(), remembered in `warm` between daemon passes.
+    A failed resolution forgets the settings it used, so the next pass sees
+    a profile or root folder created in Radarr since.
+    """
+    if "config" not in warm:
+        with STATS.span("radarr config"):
+            try:
+                warm["config"] = resolve_radarr_config(args, radarr, warm.setdefault("settings", {}))
+            except Exception:
+                forget_radarr_config(args, radarr, warm)
+                raise
+    return warm["config"]
+
+
+def forget_radarr_config(args: argparse.Namespace, radarr: RadarrAPI, warm: Dict[str, Any]) -> None:
+    """Drop the resolved config, in memory and on disk, so the next run refetches it."""
+    warm.pop("config", None)
+    warm.get("settings", {}).clear()
+    cache_path = radarr_config_path(args, radarr)
+    if cache_path and os.path.exists(cache_path):
+        os.remove(cache_path)
+
+
+# Options a [[profile]] table in --config may set; the rest apply to the whole run.
+PROFILE_OPTIONS = {
+    "lang", "genres", "min_vote_avg", "min_vote_count", "year_from", "year_to", "max_pages", "shard",
+    "tags", "quality_profile", "root_folder", "monitored", "minimum_availability",
+}
+# Options a [[radarr]] table may set, on top of the profile's.
+RADARR_OPTIONS = {"tags", "quality_profile", "root_folder", "monitored", "minimum_availability"}
+
+
+def apply_options(
+    ap: argparse.ArgumentParser, args: argparse.Namespace, table: Dict[str, Any], allowed: Set[str], where: str
+) -> argparse.Namespace:
+    """
+    A copy of `args` with a config table's options applied. Values are parsed
+    by `ap` so they get the same types and checks as on the command line.
+    """
+    unknown = set(table) - allowed
+    if unknown:
+        raise SystemExit(f"{where}: unknown option(s) {', '.join(sorted(unknown))}")
+    argv = [args.command]
+    for key, value in table.items():
+        if isinstance(value, list):
+            value = ",".join(str(v) for v in value)
+        elif isinstance(value, bool):
+            value = str(value).lower()
+        argv += [f"--{key.replace('_', '-')}", str(value)]
+    return ap.parse_args(argv, namespace=argparse.Namespace(**vars(args)))
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def load_profiles(config: Dict[str, Any], path: str, ap: argparse.ArgumentParser, args: argparse.Namespace) -> List[argparse.Namespace]:
+    """
+    The [[profile]] tables of a config. Each profile starts from the
+    command-line/env options and overrides any of PROFILE_OPTIONS.
+    """
+    profiles: List[argparse.Namespace] = []
+    for i, table in enumerate(config.get("profile") or [], 1):
+        table = dict(table)
+        name = str(table.pop("name", f"profile-{i}"))
+        p = apply_options(ap, args, table, PROFILE_OPTIONS, f"{path}: profile '{name}'")
+        p.profile = name
+        profiles.append(p)
+    return profiles
+
+
+RadarrTarget = Tuple[str, str, str, Dict[str, Any]]  # name, url, api key, option overrides
+
+
+def load_radarr_targets(config: Dict[str, Any], path: str) -> List[RadarrTarget]:
+    """
+    The [[radarr]] tables of a config: name, url, and api_key (or api_key_env,
+    the name of an env var holding it), plus any of RADARR_OPTIONS.
+    """
+    targets: List[RadarrTarget] = []
+    for i, table in enumerate(config.get("radarr") or [], 1):
+        table = dict(table)
+        name = str(table.pop("name", f"radarr-{i}"))
+        url = str(table.pop("url", "")).rstrip("/")
+        key_env = table.pop("api_key_env", "")
+        key = str(table.pop("api_key", "") or (env(key_env, required=True) if key_env else ""))
+        if not url or not key:
+            raise SystemExit(f"{path}: radarr '{name}' needs url and api_key or api_key_env")
+        targets.append((name, url, key, table))
+    return targets
+
+
+class ThreadPrefixedStream:
+    """
+    Wraps sys.stdout/sys.stderr while several Radarr instances run at once:
+    writes are buffered per thread and emitted as whole lines, each prefixed
+    with the writing thread's LOG_PREFIX.value, so logs do not interleave.
+    """
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def write(self, s: str) -> int:
+        *lines, self._local.buf = (getattr(self._local, "buf", "") + s).split("\n")
+        if lines:
+            prefix = getattr(LOG_PREFIX, "value", "")
+            with self._lock:
+                self.stream.write("".join(f"{prefix}{line}\n" for line in lines))
+        return len(s)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+
+LOG_PREFIX = threading.local()
+
+
+class Subscription:
+    """One consumer's view of a broadcast(); close() (or an error) detaches it."""
+
+    END = object()
+
+    def __init__(self, q: "queue.Queue[Any]", closed: Set[int], i: int):
+        self.q, self.closed, self.i = q, closed, i
+
+    def __iter__(self) -> "Subscription":
+        return self
+
+    def __next__(self) -> Any:
+        x = self.q.get() if self.i not in self.closed else self.END
+        if x is self.END or isinstance(x, Exception):
+            self.close()
+            if x is self.END:
+                raise StopIteration
+            raise x
+        return x
+
+    def close(self) -> None:
+        self.closed.add(self.i)
+
+
+def broadcast(items: Iterable[Any], n: int, maxsize: int) -> List[Subscription]:
+    """
+    Hand every item of one iterator to n consumers. A background thread pulls
+    the items once; bounded queues let the slowest consumer set the pace.
+    A consumer that closes early is skipped; an error reaches all of them.
+    """
+    queues: List["queue.Queue[Any]"] = [queue.Queue(maxsize) for _ in range(n)]
+    closed: Set[int] = set()
+
+    def put(i: int, x: Any) -> None:
+        while i not in closed:
+            try:
+                queues[i].put(x, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def pump() -> None:
+        last: Any = Subscription.END
+        try:
+            for x in items:
+                if len(closed) == n:
+                    return
+                for i in range(n):
+                    put(i, x)
+        except Exception as e:
+            last = e
+        for i in range(n):
+            put(i, last)
+
+    threading.Thread(target=pump, daemon=True).start()
+    return [Subscription(q, closed, i) for i, q in enumerate(queues)]
+
+
+Target = Tuple[argparse.Namespace, RadarrAPI, str]  # per-instance args, client, url
+
+
+def target_warm(warm: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Daemon state of one profile on one instance; Radarr settings are shared per instance."""
+    tw = warm.setdefault((args.profile, args.instance), {})
+    tw["settings"] = warm.setdefault(("settings", args.instance), {})
+    return tw
+
+
+def run_fanout(targets: List[Target], plan_file: str, warm: Dict[str, Any]) -> int:
+    """
+    One run against several Radarr instances. Library snapshots load in
+    parallel, TMDb discovery runs once (from the oldest watermark of any
+    instance) and its results are streamed to every instance, which dedups
+    and adds on its own thread with its own profile, tags and root folder.
+    """
+
+    def prefixed(name: str, fn: Callable[..., Any], *a: Any) -> Any:
+        LOG_PREFIX.value = f"[{name}] "
+        try:
+            return fn(*a)
+        finally:
+            LOG_PREFIX.value = ""
+
+    out, err = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = ThreadPrefixedStream(out), ThreadPrefixedStream(err)
+    try:
+        with ThreadPoolExecutor(max_workers=2 * len(targets)) as pool:
+            configs = [pool.submit(prefixed, t[0].instance, warm_radarr_config, t[0], t[1], target_warm(warm, t[0])) for t in targets]
+            states = list(pool.map(lambda t: prefixed(t[0].instance, load_dedup_state, *t), targets))
+            for c in configs:
+                c.result()
+            sinces = [since for _, _, since, _ in states]
+            since = None if None in sinces else min(sinces)
+            args0 = targets[0][0]
+            streams = broadcast(discover_candidates(args0, since), len(targets), TMDB_PAGE_SIZE * max(1, args0.concurrency))
+
+            def run_one(t: Target, state: Tuple[IntSet, Dict[int, str], Optional[date], str], stream: Subscription) -> int:
+                args, radarr, radarr_url = t
+                existing, processed, _, watermark_path = state
+                meta = plan_meta(args, watermark_path, "")
+                items = filter_candidates(args, stream, existing, processed, meta)
+                try:
+                    return run_pipeline(args, radarr, radarr_url, plan_file, target_warm(warm, args), (items, meta))
+                finally:
+                    stream.close()  # stop taking candidates if the run failed
+
+            return max(pool.map(lambda job: prefixed(job[0][0].instance, run_one, *job), zip(targets, states, streams)))
+    finally:
+        sys.stdout, sys.stderr = out, err
+
+
+def run_profiles(runs: List[List[Target]], plan_file: str, warm: Dict[str, Any]) -> int:
+    """
+    One pass over every profile, in order. Each profile runs against all of
+    its Radarr targets; Radarr settings are fetched once per instance, the
+    library snapshot is delta-refreshed between profiles, and a movie one
+    profile picked for an instance is skipped by later profiles there.
+    """
+    rc = 0
+    for targets in runs:
+        args = targets[0][0]
+        if args.profile:
+            print(f"=== Profile: {args.profile} ===\n")
+        if len(targets) == 1:
+            rc = max(rc, run_pipeline(*targets[0], plan_file, target_warm(warm, args)))
+        else:
+            rc = max(rc, run_fanout(targets, plan_file, warm))
+        if args.profile:
+            print()
+    return rc
+
+
+def run_pipeline(
+    args: argparse.Namespace,
+    radarr: RadarrAPI,
+    radarr_url: str,
+    plan_file: str,
+    warm: Dict[str, Any],
+    plan: Optional[Tuple[Iterator[PlanItem], Dict[str, Any]]] = None,
+) -> int:
+    """
+    One run/plan/apply pass. `warm` carries state a daemon reuses between
+    passes (the resolved Radarr config and the Radarr settings behind it).
+    A run can be handed its `plan` (items, meta) instead of discovering itself.
+    """
+    journal_file = f"{plan_file}.journal"
+
+    if args.command == "plan":
+        to_add, meta = plan_movies(args, radarr, radarr_url)
+        write_plan(plan_file, meta, to_add)
+        # A fresh plan starts a fresh journal.
+        if os.path.exists(journal_file):
+            os.remove(journal_file)
+        print(f"Plan written to {plan_file} ({len(to_add)} movies).")
+        return 0
+
+    # Resolve config while the library snapshot loads
+    items: Iterable[PlanItem]
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        config = pool.submit(warm_radarr_config, args, radarr, warm)
+        if args.command == "run" and args.engine != "async":
+            # Adds start while later Discover pages are still being fetched.
+            items, meta = plan or stream_plan(args, radarr, radarr_url)
+        root_folder, quality_profile_id, tag_ids = config.result()
+
+    print(f"Radarr root folder: {root_folder}")
+    print(f"Radarr qualityProfileId: {quality_profile_id}")
+    print(f"Radarr tags: {tag_ids if tag_ids else 'none'}")
+    print(f"Dry run: {args.dry_run}\n")
+
+    journal: Optional[Journal] = None
+    if args.command == "apply":
+        meta, planned = read_plan(plan_file)
+        if not args.dry_run:
+            journal = Journal(journal_file)
+            if journal.done:
+                print(f"Resuming: {len(journal.done)} movies already applied per {journal_file}.\n")
+        done = journal.done if journal is not None else {}
+        items = (item for item in planned if item[0] not in done)
+    elif args.engine == "async":
+        handled, failures, added_ids, meta = asyncio.run(
+            run_async_pipeline(args, radarr, radarr_url, root_folder, quality_profile_id, tag_ids)
+        )
+
+    try:
+        if args.command == "apply" or args.engine != "async":
+            handled, failures, added_ids = apply_movies(args, radarr, items, root_folder, quality_profile_id, tag_ids, journal)
+
+        if journal is not None:
+            # Include movies added before a crash, but skip searches an earlier apply already queued.
+            added_ids = journal.unsearched()
+
+        if args.defer_search and added_ids and not args.dry_run:
+            print()
+            with STATS.span("radarr search"):
+                queue_movie_searches(
+                    radarr, added_ids, args.search_batch_size, args.search_wave_delay,
+                    on_wave=journal.record_searched if journal is not None else None,
+                )
+    finally:
+        if journal is not None:
+            journal.close()
+
+    if not args.dry_run:
+        advance_watermark(meta, handled, bool(failures))
+
+    if failures:
+        # Re-resolve next time in case a root folder, profile or tag went away.
+        forget_radarr_config(args, radarr, warm)
+        print(f"\n{len(failures)} of {len(handled) + len(failures)} movies failed to add:", file=sys.stderr)
+        for tmdb_id, title, err in failures:
+            print(f"  tmdbId={tmdb_id} {title}: {err}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def report_timings(args: argparse.Namespace) -> None:
+    if args.timings == "table":
+        print(f"\nTimings:\n{STATS.table()}")
+    elif args.timings == "json":
+        print(json.dumps(STATS.summary()))
+    if args.timings_file:
+        save_state(args.timings_file, STATS.summary())
 
 
 def main() -> int:
     ap = argparse.ArgumentParser(description="Discover Korean horror-ish movies from TMDb and add to Radarr (tmdbsimple + pyarr).")
+    ap.add_argument("command", nargs="?", default="run", choices=["run", "plan", "apply"],
+                    help="run = plan + apply in one go; plan = write the movies to add to --plan-file; "
+                         "apply = add the movies from --plan-file, resuming from its journal.")
+    ap.add_argument("--config", default=env("PICKER_CONFIG", ""),
+                    help="TOML file with [[profile]] tables (discovery filter sets, each with its own Radarr tags, "
+                         "root folder and quality profile) and/or [[radarr]] tables (several Radarr instances fed "
+                         "from one discovery), all run in one pass (run command only).")
+    ap.add_argument("--plan-file", default=env("PLAN_FILE", ""),
+                    help="JSONL plan for plan/apply (default: STATE_DIR/plan.jsonl, else ./plan.jsonl). "
+                         "Apply results are journaled to <plan-file>.journal.")
 
     # Radarr options
     ap.add_argument("--dry-run", action="store_true", default=(env("DRY_RUN", "false").lower() == "true"),
@@ -242,6 +2434,18 @@ def main() -> int:
                     help="Root folder path (default: Radarr first root folder).")
     ap.add_argument("--monitored", default=env("MONITORED", "true"), choices=["true", "false"],
                     help="Whether added movies are monitored.")
+    ap.add_argument("--radarr-workers", type=int, default=int(env("RADARR_CONCURRENCY", "1")),
+                    help="Parallel Radarr lookups/adds (1 = sequential).")
+    ap.add_argument("--skip-lookup", action="store_true", default=(env("RADARR_SKIP_LOOKUP", "false").lower() == "true"),
+                    help="Add straight from TMDb data; only look the movie up in Radarr if the add is rejected.")
+    ap.add_argument("--batch-size", type=int, default=int(env("RADARR_BATCH_SIZE", "0")),
+                    help="Add movies in chunks of this size through Radarr's bulk import endpoint (0 = one request per movie).")
+    ap.add_argument("--defer-search", action="store_true", default=(env("RADARR_DEFER_SEARCH", "false").lower() == "true"),
+                    help="Add without searching, then search all added movies with batched MoviesSearch commands at the end.")
+    ap.add_argument("--search-batch-size", type=int, default=int(env("RADARR_SEARCH_BATCH_SIZE", "25")),
+                    help="Movies per deferred MoviesSearch command.")
+    ap.add_argument("--search-wave-delay", type=float, default=float(env("RADARR_SEARCH_WAVE_DELAY", "60")),
+                    help="Seconds between deferred MoviesSearch commands.")
     ap.add_argument("--minimum-availability", default=env("MINIMUM_AVAILABILITY", "released"),
                     help="released|announced|inCinemas|preDB (Radarr minimum availability).")
 
@@ -251,82 +2455,163 @@ def main() -> int:
     ap.add_argument("--year-from", type=int, default=int(env("YEAR_FROM", "2000")))
     ap.add_argument("--year-to", type=int, default=int(env("YEAR_TO", str(time.gmtime().tm_year))))
     ap.add_argument("--max-pages", type=int, default=int(env("MAX_PAGES", "3")))
+    ap.add_argument("--concurrency", type=int, default=int(env("TMDB_CONCURRENCY", "1")),
+                    help="Parallel TMDb page fetches (1 = sequential).")
+    ap.add_argument("--tmdb-rate", type=float, default=float(env("TMDB_RATE_LIMIT", "10")),
+                    help="Target TMDb requests per second (shrinks on 429, recovers on success).")
+    ap.add_argument("--shard", default=env("DISCOVER_SHARD", "none"), choices=["none", "year"],
+                    help="Split discovery into per-year date windows (bisected further past TMDb's 500-page cap).")
     ap.add_argument("--genres", default=env("INCLUDE_GENRE_IDS", "27,53"),
                     help="TMDb genre IDs, comma-separated. Horror=27 Thriller=53.")
     ap.add_argument("--lang", default=env("ORIGINAL_LANGUAGE", "ko"),
                     help="TMDb original language code (default: ko).")
 
+    ap.add_argument("--engine", default=env("ENGINE", "thread"), choices=["thread", "async"],
+                    help="Both stream Discover pages into adds. thread = prefetching page pool plus a Radarr pool, "
+                         "results reported in discovery order; async = asyncio stages, reported as adds complete (run only).")
+
+    # Record / replay
+    ap.add_argument("--record", default=env("HTTP_RECORD", ""),
+                    help="Record every TMDb and Radarr response to this JSONL cassette (API keys scrubbed).")
+    ap.add_argument("--replay", default=env("HTTP_REPLAY", ""),
+                    help="Answer TMDb and Radarr requests from this cassette instead of the network.")
+    ap.add_argument("--replay-latency", type=float, default=float(env("REPLAY_LATENCY", "0")),
+                    help="Replay each response after this multiple of its recorded latency (0 = full speed, 1 = original timings).")
+
+    # Instrumentation
+    ap.add_argument("--timings", default=env("TIMINGS", "none"), choices=["none", "table", "json"],
+                    help="Print per-phase timings and per-service HTTP stats after each run.")
+    ap.add_argument("--timings-file", default=env("TIMINGS_FILE", ""),
+                    help="Also write the timings of the last run as JSON to this file.")
+
+    ap.add_argument("--metrics-port", type=int, default=int(env("METRICS_PORT", "0")),
+                    help="Serve Prometheus metrics on this port at /metrics (daemon mode; 0 = off).")
+    ap.add_argument("--pushgateway", default=env("PUSHGATEWAY_URL", ""),
+                    help="Pushgateway base URL; metrics are PUT there after each run.")
+    ap.add_argument("--metrics-job", default=env("METRICS_JOB", "radarr_tmdb_picker"),
+                    help="Pushgateway job name.")
+
+    # Daemon mode
+    ap.add_argument("--daemon", action="store_true", default=(env("DAEMON", "false").lower() == "true"),
+                    help="Stay running and repeat the run on --interval or --schedule, keeping caches warm.")
+    ap.add_argument("--interval", type=float, default=float(env("RUN_INTERVAL", "3600")),
+                    help="Seconds between daemon runs (ignored with --schedule).")
+    ap.add_argument("--schedule", default=env("SCHEDULE", ""),
+                    help="5-field cron expression for daemon runs, e.g. '30 * * * *' (local time).")
+
+    # Persistent state
+    ap.add_argument("--state-dir", default=env("STATE_DIR", ""),
+                    help="Directory for persisted state between runs (mount a volume here).")
+    ap.add_argument("--incremental", action="store_true", default=(env("INCREMENTAL", "false").lower() == "true"),
+                    help="Only discover releases newer than the last run's watermark (needs --state-dir).")
+    ap.add_argument("--cache-ttl", default=env("TMDB_CACHE_TTL", "0"),
+                    help="TMDb response cache TTL in seconds, or per endpoint: 'discover/movie=3600,*=86400' (0 = off; needs --state-dir).")
+    ap.add_argument("--cache-max-mb", type=int, default=int(env("TMDB_CACHE_MAX_MB", "64")),
+                    help="Size bound of the TMDb response cache; least recently used entries are evicted.")
+    ap.add_argument("--library-snapshot-ttl", type=float, default=env("LIBRARY_SNAPSHOT_TTL", "") or None,
+                    help="Seconds a persisted Radarr library snapshot is delta-refreshed before a full re-download "
+                         "(0 = always download; default 0, or 86400 with --daemon/--config; needs --state-dir).")
+    ap.add_argument("--radarr-config-ttl", type=float, default=float(env("RADARR_CONFIG_TTL", "0")),
+                    help="Seconds to reuse the cached Radarr root folders/quality profiles/tags, checked with one "
+                         "system/status call (0 = fetch every run; needs --state-dir).")
+    ap.add_argument("--overlap-days", type=int, default=int(env("WATERMARK_OVERLAP_DAYS", "30")),
+                    help="Days before the watermark to re-scan, for titles that only recently passed the vote filters.")
+
     args = ap.parse_args()
+    if args.incremental and not args.state_dir:
+        raise SystemExit("INCREMENTAL requires STATE_DIR / --state-dir")
+    if args.engine == "async" and args.batch_size > 0:
+        raise SystemExit("ENGINE=async adds movies one at a time; unset RADARR_BATCH_SIZE")
+    if args.daemon and args.command != "run":
+        raise SystemExit("--daemon only supports the run command")
+    if args.config and args.command != "run":
+        raise SystemExit("--config only supports the run command")
+    if args.library_snapshot_ttl is None:
+        # Unless told otherwise, long-lived and multi-profile runs keep the
+        # library warm between runs; a full re-download once a day.
+        args.library_snapshot_ttl = 86400.0 if args.daemon or args.config else 0.0
+    config = load_config(args.config) if args.config else {}
+    args.profile, args.instance = "", ""
+    profiles = load_profiles(config, args.config, ap, args) or [args]
+    targets = load_radarr_targets(config, args.config)
+    if args.config and not (config.get("profile") or targets):
+        raise SystemExit(f"{args.config}: no [[profile]] or [[radarr]] tables")
+    if len(targets) > 1 and args.engine == "async":
+        raise SystemExit("Several [[radarr]] instances are fed by the thread engine; unset ENGINE=async")
+    if args.schedule:
+        next_cron_time(args.schedule, time.time())  # fail fast on a bad expression
+    if args.record and args.replay:
+        raise SystemExit("--record and --replay are mutually exclusive")
+    plan_file = args.plan_file or os.path.join(args.state_dir or ".", "plan.jsonl")
+
+    global TMDB_CACHE, TMDB_API_URL, CASSETTE
+    if args.record:
+        CASSETTE = Cassette(args.record, "record")
+    elif args.replay:
+        CASSETTE = Cassette(args.replay, "replay", args.replay_latency)
 
     # Required env
-    tmdb.API_KEY = env("TMDB_API_KEY", required=True)
-    radarr_url = env("RADARR_URL", required=True).rstrip("/")
-    radarr_key = env("RADARR_API_KEY", required=True)
-
-    # Radarr client
-    radarr = RadarrAPI(radarr_url, radarr_key)
-
-    # Resolve config
-    root_folder = args.root_folder.strip() or radarr_default_root_folder(radarr)
-    quality_profile_id = resolve_quality_profile_id(radarr, args.quality_profile.strip() or None)
-    tag_ids = resolve_tag_ids(radarr, [t for t in args.tags.split(",") if t.strip()])
-    monitored = args.monitored == "true"
-
-    print(f"Radarr root folder: {root_folder}")
-    print(f"Radarr qualityProfileId: {quality_profile_id}")
-    print(f"Radarr tags: {tag_ids if tag_ids else 'none'}")
-    print(f"Dry run: {args.dry_run}\n")
-
-    existing = radarr_existing_tmdb_ids(radarr)
-    print(f"Radarr currently has {len(existing)} movies with tmdbId.\n")
-
-    candidates = discover_movies(
-        original_language=args.lang,
-        include_genre_ids=args.genres,
-        min_vote_avg=args.min_vote_avg,
-        min_vote_count=args.min_vote_count,
-        year_from=args.year_from,
-        year_to=args.year_to,
-        max_pages=args.max_pages,
-    )
-
-    print(f"TMDb candidates fetched: {len(candidates)}")
-
-    seen: Set[int] = set()
-    to_add: List[Tuple[int, str, Optional[int], str]] = []
-
-    for m in candidates:
-        tmdb_id = m.get("id")
-        if not isinstance(tmdb_id, int) or tmdb_id in seen:
-            continue
-        seen.add(tmdb_id)
-
-        if tmdb_id in existing:
-            continue
-
-        title = m.get("title") or m.get("original_title") or f"tmdb:{tmdb_id}"
-        release_date = m.get("release_date") or "????-??-??"
-        year = parse_year(m.get("release_date") or "")
-        to_add.append((tmdb_id, title, year, release_date))
-
-    print(f"Movies to add: {len(to_add)}\n")
-
-    for tmdb_id, title, year, release_date in to_add:
-        print(f"{release_date} | {title} | tmdbId={tmdb_id}")
-        add_movie_to_radarr(
-            radarr=radarr,
-            tmdb_id=tmdb_id,
-            title=title,
-            year=year,
-            root_folder=root_folder,
-            quality_profile_id=quality_profile_id,
-            tag_ids=tag_ids,
-            monitored=monitored,
-            minimum_availability=args.minimum_availability,
-            dry_run=args.dry_run,
-        )
-
-    return 0
+    if args.command != "apply":
+        tmdb.API_KEY = env("TMDB_API_KEY", required=True)
+    TMDB_LIMITER.set_rate(args.tmdb_rate)
+    tmdb.REQUESTS_SESSION = make_session(args.concurrency)
+    tmdb.REQUESTS_SESSION.hooks["response"].append(TMDB_LIMITER.observe)
+    tmdb.REQUESTS_SESSION.hooks["response"].append(STATS.observer("tmdb"))
+
+    TMDB_API_URL = env("TMDB_API_URL", "").rstrip("/")
+    ttls = parse_ttls(args.cache_ttl)
+    if args.state_dir and any(v > 0 for v in ttls.values()):
+        TMDB_CACHE = ResponseCache(os.path.join(args.state_dir, "tmdb-cache.sqlite"), ttls, args.cache_max_mb << 20)
+    if not targets:
+        targets = [("", env("RADARR_URL", required=True).rstrip("/"), env("RADARR_API_KEY", required=True), {})]
+
+    # Radarr clients, and per profile the args for each of them. Claims are
+    # per instance: a movie can go to the 1080p and the 4K Radarr alike.
+    runs: List[List[Target]] = [[] for _ in profiles]
+    claims: List[Set[int]] = []
+    for name, radarr_url, radarr_key, table in targets:
+        radarr = RadarrAPI(radarr_url, radarr_key)
+        radarr.session = make_session(args.radarr_workers)
+        radarr.session.hooks["response"].append(STATS.observer("radarr"))
+        claimed: Set[int] = set()
+        claims.append(claimed)
+        for run_targets, p in zip(runs, profiles):
+            t_args = apply_options(ap, p, table, RADARR_OPTIONS, f"{args.config}: radarr '{name}'")
+            t_args.instance, t_args.claimed = name, claimed
+            run_targets.append((t_args, radarr, radarr_url))
+
+    warm: Dict[str, Any] = {}
+
+    def run() -> int:
+        # Claims only dedup within a pass; the library covers earlier passes.
+        for claimed in claims:
+            claimed.clear()
+        STATS.reset()
+        if TMDB_CACHE is not None:
+            TMDB_CACHE.hits = TMDB_CACHE.misses = 0
+        rc = 1
+        try:
+            with STATS.span("total"):
+                rc = run_profiles(runs, plan_file, warm)
+            return rc
+        finally:
+            # Every command reports the cache, plan included, and so do failed passes.
+            if TMDB_CACHE is not None:
+                print(f"\nTMDb cache: {TMDB_CACHE.summary()}")
+            report_timings(args)
+            METRICS.record_run(STATS, rc == 0)
+            if args.pushgateway:
+                try:
+                    push_metrics(args.pushgateway, args.metrics_job)
+                except requests.RequestException as e:
+                    print(f"Pushgateway push failed: {e}", file=sys.stderr)
+
+    if args.daemon:
+        if args.metrics_port:
+            serve_metrics(args.metrics_port)
+            print(f"Serving metrics on :{args.metrics_port}/metrics")
+        return run_daemon(args, run)
+    return run()
 
 
 if __name__ == "__main__":
@@ -334,4 +2619,4 @@ if __name__ == "__main__":
         sys.exit(main())
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
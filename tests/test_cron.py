@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+
+
+def local(*args: int) -> float:
+    return time.mktime(datetime(*args).timetuple())
+
+
+def next_run(expr: str, after: datetime) -> datetime:
+    return datetime.fromtimestamp(main.next_cron_time(expr, time.mktime(after.timetuple())))
+
+
+# Friday 16 October 2026, 19:58:44 local time.
+NOW = datetime(2026, 10, 16, 19, 58, 44)
+
+
+class CronFieldTest(unittest.TestCase):
+    def test_forms(self) -> None:
+        self.assertEqual(main._cron_field("*", 0, 5), {0, 1, 2, 3, 4, 5})
+        self.assertEqual(main._cron_field("*/15", 0, 59), {0, 15, 30, 45})
+        self.assertEqual(main._cron_field("1-5", 0, 7), {1, 2, 3, 4, 5})
+        self.assertEqual(main._cron_field("10-20/5", 0, 59), {10, 15, 20})
+        self.assertEqual(main._cron_field("5/20", 0, 59), {5, 25, 45})
+        self.assertEqual(main._cron_field("1,3,7-8", 1, 12), {1, 3, 7, 8})
+
+    def test_rejected_ranges(self) -> None:
+        for spec, lo, hi in [("60", 0, 59), ("0", 1, 31), ("5-3", 0, 59), ("1-13", 1, 12), ("8", 0, 7)]:
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                main._cron_field(spec, lo, hi)
+
+
+class NextCronTimeTest(unittest.TestCase):
+    def test_next_minute_and_hour(self) -> None:
+        self.assertEqual(next_run("* * * * *", NOW), datetime(2026, 10, 16, 19, 59))
+        self.assertEqual(next_run("30 * * * *", NOW), datetime(2026, 10, 16, 20, 30))
+        self.assertEqual(next_run("*/15 9-17 * * *", NOW), datetime(2026, 10, 17, 9, 0))
+
+    def test_strictly_after(self) -> None:
+        at = datetime(2026, 10, 16, 20, 30)
+        self.assertEqual(next_run("30 20 * * *", at), datetime(2026, 10, 17, 20, 30))
+
+    def test_leap_day(self) -> None:
+        self.assertEqual(next_run("0 0 29 2 *", NOW), datetime(2028, 2, 29, 0, 0))
+        self.assertEqual(next_run("0 0 29 2 *", datetime(2028, 2, 29, 0, 0)), datetime(2032, 2, 29, 0, 0))
+
+    def test_yearly(self) -> None:
+        self.assertEqual(next_run("59 23 31 12 *", NOW), datetime(2026, 12, 31, 23, 59))
+        self.assertEqual(next_run("0 0 1 1 *", NOW), datetime(2027, 1, 1, 0, 0))
+
+    def test_day_of_month_or_day_of_week(self) -> None:
+        # Both restricted: either matches (the 20th is a Tuesday, the 19th a Monday).
+        self.assertEqual(next_run("0 0 20 * 1", NOW), datetime(2026, 10, 19, 0, 0))
+        self.assertEqual(next_run("0 0 17 * 1", NOW), datetime(2026, 10, 17, 0, 0))
+        # One of them "*": the other one alone decides.
+        self.assertEqual(next_run("0 0 * * 1", NOW), datetime(2026, 10, 19, 0, 0))
+        self.assertEqual(next_run("0 0 20 * *", NOW), datetime(2026, 10, 20, 0, 0))
+        # Sunday is 0 or 7.
+        self.assertEqual(next_run("0 0 * * 0", NOW), datetime(2026, 10, 18, 0, 0))
+        self.assertEqual(next_run("0 0 * * 7", NOW), datetime(2026, 10, 18, 0, 0))
+
+    def test_star_step_counts_as_unrestricted(self) -> None:
+        # As in Vixie cron, "*/2" days AND Mondays: the 19th, not Saturday the 17th.
+        self.assertEqual(next_run("0 0 */2 * 1", NOW), datetime(2026, 10, 19, 0, 0))
+        self.assertEqual(next_run("0 0 */2 * 1", datetime(2026, 10, 19, 0, 0)), datetime(2026, 11, 9, 0, 0))
+
+    def test_month_skip(self) -> None:
+        self.assertEqual(next_run("0 12 * 6 *", NOW), datetime(2027, 6, 1, 12, 0))
+
+    def test_never_matches(self) -> None:
+        with self.assertRaisesRegex(ValueError, "never matches"):
+            main.next_cron_time("0 0 30 2 *", local(2026, 10, 16, 19, 58))
+        with self.assertRaisesRegex(ValueError, "needs 5 fields"):
+            main.next_cron_time("0 0 * *", local(2026, 10, 16, 19, 58))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import os
+import random
+import sys
+import unittest
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+
+DOC = [
+    {"id": 1, "title": "Movie éè ☃", "tmdbId": 100001, "images": [{"x": "y"}]},
+    0.5, -12, 1e3, 2.5E-7, 123456789, True, False, None, "a,b]c", [], {}, [1, [2, [3]]],
+    {"id": 2, "ratings": {"imdb": {"value": 7.25, "votes": 1200}}},
+]
+
+
+def split(data: bytes, cuts: List[int]) -> List[bytes]:
+    edges = [0, *sorted(cuts), len(data)]
+    return [data[a:b] for a, b in zip(edges, edges[1:])]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def test_every_single_cut(self) -> None:
+        for sep in (",", ", ", ",\n  "):
+            data = ("[" + sep.join(json.dumps(v, ensure_ascii=False) for v in DOC) + "]").encode()
+            for cut in range(len(data) + 1):
+                with self.subTest(sep=sep, cut=cut):
+                    self.assertEqual(list(main.iter_json_array(split(data, [cut]))), DOC)
+
+    def test_random_chunk_boundaries(self) -> None:
+        rng = random.Random(7)
+        data = json.dumps(DOC, ensure_ascii=False).encode()
+        for _ in range(500):
+            cuts = rng.sample(range(len(data) + 1), rng.randint(1, 12))
+            self.assertEqual(list(main.iter_json_array(split(data, cuts))), DOC)
+
+    def test_scalar_split_before_its_fraction_or_exponent(self) -> None:
+        self.assertEqual(list(main.iter_json_array([b"[0.", b"5]"])), [0.5])
+        self.assertEqual(list(main.iter_json_array([b"[1e", b"3, 2]"])), [1e3, 2])
+        self.assertEqual(list(main.iter_json_array([b"[tr", b"ue]"])), [True])
+
+    def test_truncated_array_raises(self) -> None:
+        with self.assertRaisesRegex(ValueError, "ended unexpectedly"):
+            list(main.iter_json_array([b'[{"id": 1}, 0.']))
+        with self.assertRaisesRegex(ValueError, "Expected a JSON array"):
+            list(main.iter_json_array([b'{"id": 1}']))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from typing import List, Tuple
+
+from pyarr import RadarrAPI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+import main  # noqa: E402
+from fakes import FakeRadarr  # noqa: E402
+
+
+class LibrarySnapshotTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fake = FakeRadarr(library=5, catalog=15, latency=0).start()
+        self.radarr = RadarrAPI(self.fake.url, "test")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.tmp.name, "radarr-library")
+
+    def tearDown(self) -> None:
+        self.fake.stop()
+        self.tmp.cleanup()
+        main._LIBRARY_MEMO.pop(self.snapshot, None)
+
+    def existing(self) -> Tuple[main.IntSet, str]:
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            ids = main.radarr_existing_tmdb_ids(self.radarr, self.snapshot, max_age=3600)
+        return ids, out.getvalue()
+
+    def add(self, *tmdb_ids: int) -> List[int]:
+        return [self.fake._add(self.fake._movie(0, t))["id"] for t in tmdb_ids]
+
+    def expire(self) -> None:
+        main._LIBRARY_MEMO[self.snapshot][0]["taken_at"] = 0
+
+    def test_probe_finds_new_movies(self) -> None:
+        ids, _ = self.existing()
+        self.assertEqual(len(ids), 5)
+        self.add(500001, 500002)
+        ids, out = self.existing()
+        self.assertIn(500002, ids)
+        self.assertIn("2 new since last run", out)
+
+    def test_full_download_widens_the_probe_past_a_gap(self) -> None:
+        self.existing()
+        first, *deleted_then_kept = self.add(500001, 500002, 500003, 500004)
+        for movie_id in [first, *deleted_then_kept[:2]]:
+            self.fake.delete(movie_id)
+
+        ids, _ = self.existing()
+        self.assertNotIn(500004, ids)  # behind three deleted ids, out of the probe's reach
+
+        self.expire()
+        ids, out = self.existing()
+        self.assertIn(500004, ids)
+        self.assertIn("probing up to 4 missing ids", out)
+        self.assertEqual(main.load_state(f"{self.snapshot}.json", {})["probe_misses"], 4)
+
+        # The same gap again is now walked past.
+        for movie_id in self.add(500005, 500006, 500007, 500008)[:3]:
+            self.fake.delete(movie_id)
+        ids, _ = self.existing()
+        self.assertIn(500008, ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+import unittest
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+
+
+class PushHandler(BaseHTTPRequestHandler):
+    server: "PushReceiver"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path.startswith("/metrics/job/"):
+            self.server.pushes.append((self.path, self.headers["Content-Type"], body.decode()))
+            self.send_response(200)
+        else:
+            self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class PushReceiver(ThreadingHTTPServer):
+    """Stand-in Pushgateway: keeps every PUT to /metrics/job/<job>, 404s anything else."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), PushHandler)
+        self.pushes = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def response(status: int, elapsed: float) -> requests.Response:
+    res = requests.Response()
+    res.status_code = status
+    res.headers["Content-Length"] = "10"
+    res.elapsed = timedelta(seconds=elapsed)
+    return res
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.saved = main.METRICS
+        main.METRICS = main.Metrics()
+        self.receiver = PushReceiver()
+
+    def tearDown(self) -> None:
+        main.METRICS = self.saved
+        self.receiver.shutdown()
+        self.receiver.server_close()
+
+    def test_expected_statuses_are_not_errors(self) -> None:
+        stats = main.RunStats()
+        observe = stats.observer("radarr")
+        observe(response(200, 0.01))
+        observe(response(500, 0.02))
+        with stats.expecting(404):
+            observe(response(404, 0.01))
+        observe(response(404, 0.01))
+
+        http = stats.summary()["http"]["radarr"]
+        self.assertEqual(http["calls"], 4)
+        self.assertEqual(http["errors"], 2)
+
+    def test_push_renders_counters_histogram_and_run_result(self) -> None:
+        stats = main.RunStats()
+        observe = stats.observer("tmdb")
+        for elapsed in (0.01, 0.2, 3.0):
+            observe(response(200, elapsed))
+        stats.count("movies added", 2)
+        with stats.span("total"):
+            pass
+        main.METRICS.record_run(stats, True)
+        main.METRICS.record_run(stats, False)
+
+        main.push_metrics(self.receiver.url + "/", "picker-test")
+
+        self.assertEqual(len(self.receiver.pushes), 1)
+        path, content_type, body = self.receiver.pushes[0]
+        self.assertEqual(path, "/metrics/job/picker-test")
+        self.assertEqual(content_type, "text/plain; version=0.0.4")
+        lines = body.splitlines()
+        self.assertIn("# TYPE radarr_picker_movies_added_total counter", lines)
+        self.assertIn("radarr_picker_movies_added_total 4", lines)
+        self.assertIn('radarr_picker_http_requests_total{service="tmdb"} 6', lines)
+        self.assertIn('radarr_picker_http_errors_total{service="tmdb"} 0', lines)
+        self.assertIn('radarr_picker_http_request_duration_seconds_bucket{service="tmdb",le="0.025"} 2', lines)
+        self.assertIn('radarr_picker_http_request_duration_seconds_bucket{service="tmdb",le="2.5"} 4', lines)
+        self.assertIn('radarr_picker_http_request_duration_seconds_bucket{service="tmdb",le="+Inf"} 6', lines)
+        self.assertIn('radarr_picker_http_request_duration_seconds_count{service="tmdb"} 6', lines)
+        self.assertIn('radarr_picker_runs_total{result="success"} 1', lines)
+        self.assertIn('radarr_picker_runs_total{result="failure"} 1', lines)
+        self.assertTrue(body.endswith("\n"))
+
+    def test_push_raises_on_rejection(self) -> None:
+        with self.assertRaises(requests.HTTPError):
+            main.push_metrics(self.receiver.url + "/missing", "picker-test")
+
+
+if __name__ == "__main__":
+    unittest.main()
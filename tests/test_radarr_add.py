@@ -0,0 +1,61 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+from pyarr import RadarrAPI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+import main  # noqa: E402
+from fakes import FakeRadarr  # noqa: E402
+
+# (tmdbId, title, year, release date); the middle one is added to Radarr behind the plan's back.
+ITEMS = [(100001, "Movie 1", 2025, "2025-03-01"), (100002, "Movie 2", 2025, "2025-02-01"), (100004, "Movie 4", 2025, "2025-01-01")]
+
+
+class BatchImportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fake = FakeRadarr(library=1, catalog=3, latency=0).start()  # owns tmdbId 100000
+        self.radarr = RadarrAPI(self.fake.url, "test")
+        self.fake._add(self.fake._movie(0, 100002))  # e.g. in flight when an earlier apply died
+
+    def tearDown(self) -> None:
+        self.fake.stop()
+
+    def test_movies_the_import_skips_are_already_in_radarr(self) -> None:
+        results = main.add_movie_batch_to_radarr(
+            self.radarr, ITEMS, "/movies", 1, [1], True, "released", dry_run=False, search=False,
+        )
+
+        self.assertEqual([err for _, _, err in results], [None, None, None])
+        self.assertTrue(results[0][0].startswith("Added: "))
+        self.assertEqual(results[1], ("Already in Radarr: Movie 2 (2025) tmdbId=100002", None, None))
+        self.assertTrue(results[2][0].startswith("Added: "))
+        self.assertEqual(len(self.fake.movies), 4)
+
+    def test_apply_journals_them_as_done(self) -> None:
+        args = argparse.Namespace(
+            monitored="true", minimum_availability="released", dry_run=False, defer_search=True,
+            skip_lookup=False, radarr_workers=1, batch_size=5,
+        )
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            journal = main.Journal(os.path.join(tmp, "plan.jsonl.journal"))
+            handled, failures, added_ids = main.apply_movies(args, self.radarr, ITEMS, "/movies", 1, [1], journal)
+            journal.close()
+            reread = main.Journal(journal.path)
+            reread.close()
+        done = reread.done
+
+        self.assertEqual(failures, [])
+        self.assertEqual(handled, ITEMS)
+        self.assertEqual(len(added_ids), 2)
+        self.assertEqual(sorted(done), [100001, 100002, 100004])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+from pyarr import RadarrAPI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+import main  # noqa: E402
+from fakes import FakeRadarr  # noqa: E402
+
+
+class RadarrConfigTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fake = FakeRadarr(library=1, catalog=1, latency=0).start()
+        self.radarr = RadarrAPI(self.fake.url, "test")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.args = argparse.Namespace(
+            state_dir="", radarr_config_ttl=0.0, root_folder="", quality_profile="New", tags="tmdb",
+        )
+        self.enterContext(contextlib.redirect_stdout(io.StringIO()))
+
+    def tearDown(self) -> None:
+        self.fake.stop()
+        self.tmp.cleanup()
+
+    def test_daemon_pass_after_a_failed_resolution_refetches(self) -> None:
+        warm = {}
+        with self.assertRaisesRegex(RuntimeError, "Quality profile 'New' not found"):
+            main.warm_radarr_config(self.args, self.radarr, warm)
+        self.assertEqual(warm["settings"], {})
+
+        self.fake.profiles.append({"id": 7, "name": "New"})
+        self.assertEqual(main.warm_radarr_config(self.args, self.radarr, warm), ("/movies", 7, [1]))
+
+    def test_cached_bundle_is_refetched_once_on_a_lookup_miss(self) -> None:
+        self.args.state_dir, self.args.radarr_config_ttl = self.tmp.name, 3600.0
+        self.args.quality_profile = "Any"
+        self.assertEqual(main.warm_radarr_config(self.args, self.radarr, {}), ("/movies", 1, [1]))
+
+        # The next CronJob run starts from the bundle on disk.
+        self.fake.profiles.append({"id": 7, "name": "New"})
+        self.args.quality_profile = "New"
+        self.assertEqual(main.warm_radarr_config(self.args, self.radarr, {}), ("/movies", 7, [1]))
+        bundle = main.load_state(main.radarr_config_path(self.args, self.radarr), {})
+        self.assertIn({"id": 7, "name": "New"}, bundle["profiles"])
+
+        # A name missing from freshly fetched settings still fails.
+        self.args.quality_profile = "Missing"
+        requests = self.fake.requests
+        with self.assertRaisesRegex(RuntimeError, "Quality profile 'Missing' not found"):
+            main.warm_radarr_config(self.args, self.radarr, {})
+        self.assertEqual(self.fake.requests - requests, 1 + 4)  # status check, then one refetch (status + 3 lists)
+
+
+if __name__ == "__main__":
+    unittest.main()
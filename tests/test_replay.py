@@ -0,0 +1,80 @@
+"""
+Replays tests/fixtures/replay.jsonl through main(). The cassette was recorded
+from bench/fakes.py (FakeTMDb(movies=30), FakeRadarr(library=5, catalog=30))
+with YEAR_FROM=2024 YEAR_TO=2025 MAX_PAGES=1 RADARR_TAGS=tmdb
+RADARR_DEFER_SEARCH=true RADARR_SEARCH_WAVE_DELAY=0 and --record.
+"""
+import contextlib
+import io
+import os
+import sys
+import unittest
+from typing import Tuple
+from unittest import mock
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+
+CASSETTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "replay.jsonl")
+
+ENV = {
+    "TMDB_API_KEY": "replay",
+    "RADARR_API_KEY": "replay",
+    "RADARR_URL": "http://radarr.invalid:7878",  # replay ignores the host
+    "YEAR_FROM": "2024",
+    "YEAR_TO": "2025",
+    "MAX_PAGES": "1",
+    "RADARR_TAGS": "tmdb",
+    "RADARR_DEFER_SEARCH": "true",
+    "RADARR_SEARCH_WAVE_DELAY": "0",
+}
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.saved = (main.CASSETTE, main.TMDB_CACHE, main.TMDB_API_URL)
+
+    def tearDown(self) -> None:
+        main.CASSETTE, main.TMDB_CACHE, main.TMDB_API_URL = self.saved
+
+    def run_main(self, *argv: str, **env: str) -> Tuple[int, str]:
+        out = io.StringIO()
+        # Only ENV: settings from the calling shell (DRY_RUN, STATE_DIR, ...) would change the run.
+        with mock.patch.dict(os.environ, dict(ENV, **env), clear=True), mock.patch.object(sys, "argv", ["main.py", *argv]), \
+                contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            rc = main.main()
+        return rc, out.getvalue()
+
+    def test_replay_adds_the_recorded_movies(self) -> None:
+        rc, out = self.run_main("--replay", CASSETTE)
+
+        self.assertEqual(rc, 0, out)
+        self.assertIn("Radarr currently has 5 movies with tmdbId.", out)
+        self.assertIn("Added: Movie 100001 (2020) tmdbId=100001 radarrId=6", out)
+        self.assertIn("Added: Movie 100002 (2020) tmdbId=100002 radarrId=7", out)
+        self.assertIn("Queued MoviesSearch for 2 movies.", out)
+        summary = main.STATS.summary()
+        self.assertEqual(summary["counters"]["movies added"], 2)
+        self.assertEqual(summary["counters"]["duplicates skipped"], 1)
+        self.assertEqual(summary["http"]["tmdb"]["calls"], 1)
+        self.assertEqual(summary["http"]["radarr"]["calls"], 9)
+        self.assertEqual(summary["http"]["radarr"]["errors"], 0)
+
+    def test_unrecorded_request_fails(self) -> None:
+        # Another filter asks TMDb a question the cassette has no answer for.
+        with self.assertRaisesRegex(requests.ConnectionError, "No recorded response for GET /3/discover/movie"):
+            self.run_main("--replay", CASSETTE, MIN_VOTE_AVG="8.0")
+
+    def test_unrecorded_request_body_fails(self) -> None:
+        cassette = main.Cassette(CASSETTE, "replay")
+        request = requests.Request(
+            "POST", "http://radarr.invalid:7878/api/v3/movie", json={"tmdbId": 999, "title": "Not recorded"}
+        ).prepare()
+        with self.assertRaisesRegex(requests.ConnectionError, "with this request body"):
+            cassette.respond(request)
+
+
+if __name__ == "__main__":
+    unittest.main()